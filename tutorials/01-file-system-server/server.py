@@ -6,8 +6,11 @@ Provides file system operations through MCP protocol.
 Includes tools for file operations, resources for browsing, and prompts for automation.
 """
 
+import asyncio
+import functools
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from mcp.server.fastmcp import FastMCP
@@ -21,8 +24,27 @@ mcp = FastMCP("FileSystem")
 file_manager = FileManager()
 security = SecurityValidator()
 
+# Bounded pool for blocking filesystem work; caps how many threads a burst
+# of concurrent clients can tie up
+io_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="fs-io")
+
+
+def run_in_io_pool(func):
+    """Run a blocking tool body on the I/O pool instead of the event loop.
+    
+    The whole body (path validation, the file operation and formatting)
+    crosses to the pool as one call rather than one hop per syscall.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(io_pool, functools.partial(func, *args, **kwargs))
+    return wrapper
+
+
 # File operation tools
 @mcp.tool()
+@run_in_io_pool
 def read_file(path: str) -> str:
     """Read contents of a file"""
     try:
@@ -32,6 +54,7 @@ def read_file(path: str) -> str:
         return f"Error reading file: {str(e)}"
 
 @mcp.tool()
+@run_in_io_pool
 def write_file(path: str, content: str, create_dirs: bool = False) -> str:
     """Write content to a file"""
     try:
@@ -42,6 +65,7 @@ def write_file(path: str, content: str, create_dirs: bool = False) -> str:
         return f"Error writing file: {str(e)}"
 
 @mcp.tool()
+@run_in_io_pool
 def create_directory(path: str) -> str:
     """Create a new directory"""
     try:
@@ -52,6 +76,7 @@ def create_directory(path: str) -> str:
         return f"Error creating directory: {str(e)}"
 
 @mcp.tool()
+@run_in_io_pool
 def delete_file(path: str) -> str:
     """Delete a file"""
     try:
@@ -62,23 +87,28 @@ def delete_file(path: str) -> str:
         return f"Error deleting file: {str(e)}"
 
 @mcp.tool()
+@run_in_io_pool
 def list_directory(path: str = ".", show_hidden: bool = False) -> str:
     """List contents of a directory"""
     try:
         validated_path = security.validate_path(path)
         items = file_manager.list_directory(validated_path, show_hidden)
         
-        result = f"Contents of {path}:\n"
+        # Collect the lines and join once; repeated += copies the whole
+        # listing for every entry
+        lines = [f"Contents of {path}:"]
         for item in items:
             icon = "📁" if item["is_dir"] else "📄"
             size = f" ({item['size']} bytes)" if not item["is_dir"] else ""
-            result += f"{icon} {item['name']}{size}\n"
+            lines.append(f"{icon} {item['name']}{size}")
+        lines.append("")
         
-        return result
+        return "\n".join(lines)
     except Exception as e:
         return f"Error listing directory: {str(e)}"
 
 @mcp.tool()
+@run_in_io_pool
 def file_info(path: str) -> str:
     """Get detailed information about a file or directory"""
     try:
@@ -97,6 +127,7 @@ def file_info(path: str) -> str:
 
 # Directory browsing resources
 @mcp.resource("fs://dir/{path}")
+@run_in_io_pool
 def browse_directory(path: str) -> str:
     """Browse directory contents as a resource"""
     try:
@@ -116,6 +147,7 @@ def browse_directory(path: str) -> str:
         return json.dumps({"error": str(e)})
 
 @mcp.resource("fs://file/{path}")
+@run_in_io_pool
 def file_content(path: str) -> str:
     """Get file content as a resource"""
     try:
@@ -190,5 +222,4 @@ def file_documentation(path: str, doc_type: str = "README") -> str:
 
 if __name__ == "__main__":
     # Run the server
-    import asyncio
     mcp.run()
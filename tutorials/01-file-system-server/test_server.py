@@ -18,12 +18,16 @@ from server import (
     list_directory, file_info, browse_directory, file_content,
     file_script, file_documentation, file_manager
 )
+from file_operations import PARALLEL_UNLINK_THRESHOLD
 from test_config import TestSecurityValidator
 
 # Replace the security validator with test version
 import server
 server.security = TestSecurityValidator()
 
+# Size of the files used to test reading large files
+LARGE_FILE_SIZE = 2 * 1024 * 1024
+
 
 class TestFileSystemMCPServer:
     """Test class for File System MCP Server"""
@@ -47,19 +51,19 @@ class TestFileSystemMCPServer:
         self.test_file.write_text(self.test_content)
         
         # Test reading
-        result = read_file(str(self.test_file))
+        result = asyncio.run(read_file(str(self.test_file)))
         assert self.test_content in result
         
     def test_read_file_not_found(self):
         """Test reading non-existent file"""
-        result = read_file("/nonexistent/file.txt")
+        result = asyncio.run(read_file("/nonexistent/file.txt"))
         assert "Error reading file" in result
         
     def test_write_file_success(self):
         """Test successful file writing"""
         test_path = str(Path(self.test_dir) / "new_file.txt")
         
-        result = write_file(test_path, self.test_content)
+        result = asyncio.run(write_file(test_path, self.test_content))
         
         assert "Successfully wrote" in result
         assert Path(test_path).read_text() == self.test_content
@@ -68,7 +72,7 @@ class TestFileSystemMCPServer:
         """Test writing file with directory creation"""
         test_path = str(Path(self.test_dir) / "new_dir" / "new_file.txt")
         
-        result = write_file(test_path, self.test_content, create_dirs=True)
+        result = asyncio.run(write_file(test_path, self.test_content, create_dirs=True))
         
         assert "Successfully wrote" in result
         assert Path(test_path).exists()
@@ -77,7 +81,7 @@ class TestFileSystemMCPServer:
         """Test successful directory creation"""
         new_dir = str(Path(self.test_dir) / "new_directory")
         
-        result = create_directory(new_dir)
+        result = asyncio.run(create_directory(new_dir))
         
         assert "Successfully created directory" in result
         assert Path(new_dir).is_dir()
@@ -87,7 +91,7 @@ class TestFileSystemMCPServer:
         # Create test file
         self.test_file.write_text(self.test_content)
         
-        result = delete_file(str(self.test_file))
+        result = asyncio.run(delete_file(str(self.test_file)))
         
         assert "Successfully deleted" in result
         assert not self.test_file.exists()
@@ -99,7 +103,7 @@ class TestFileSystemMCPServer:
         (Path(self.test_dir) / "file2.txt").write_text("content2")
         (Path(self.test_dir) / "subdir").mkdir()
         
-        result = list_directory(self.test_dir)
+        result = asyncio.run(list_directory(self.test_dir))
         
         assert "file1.txt" in result
         assert "file2.txt" in result
@@ -114,12 +118,12 @@ class TestFileSystemMCPServer:
         (Path(self.test_dir) / "visible.txt").write_text("visible content")
         
         # Test without hidden files
-        result_no_hidden = list_directory(self.test_dir, show_hidden=False)
+        result_no_hidden = asyncio.run(list_directory(self.test_dir, show_hidden=False))
         assert ".hidden" not in result_no_hidden
         assert "visible.txt" in result_no_hidden
         
         # Test with hidden files
-        result_with_hidden = list_directory(self.test_dir, show_hidden=True)
+        result_with_hidden = asyncio.run(list_directory(self.test_dir, show_hidden=True))
         assert ".hidden" in result_with_hidden
         assert "visible.txt" in result_with_hidden
         
@@ -128,7 +132,7 @@ class TestFileSystemMCPServer:
         # Create test file
         self.test_file.write_text(self.test_content)
         
-        result = file_info(str(self.test_file))
+        result = asyncio.run(file_info(str(self.test_file)))
         
         assert "File Information" in result
         assert "Type: File" in result
@@ -138,10 +142,154 @@ class TestFileSystemMCPServer:
         
     def test_file_info_directory(self):
         """Test file info for directory"""
-        result = file_info(self.test_dir)
+        result = asyncio.run(file_info(self.test_dir))
         
         assert "Type: Directory" in result
         
+    # File Operation Tests
+    def test_delete_file_not_found(self):
+        """Test deleting a non-existent file"""
+        missing = str(Path(self.test_dir) / "missing.txt")
+        
+        result = asyncio.run(delete_file(missing))
+        
+        assert "Error deleting file" in result
+        assert "File not found" in result
+        
+    def test_delete_directory_tree(self):
+        """Test deleting a directory tree large enough for parallel unlinking"""
+        tree = Path(self.test_dir) / "tree"
+        (tree / "nested").mkdir(parents=True)
+        for i in range(PARALLEL_UNLINK_THRESHOLD + 6):
+            (tree / f"file_{i:03d}.txt").write_text(f"content {i}")
+        (tree / "nested" / "inner.txt").write_text("inner")
+        
+        result = asyncio.run(delete_file(str(tree)))
+        
+        assert "Successfully deleted" in result
+        assert not tree.exists()
+        
+    def test_delete_directory_keeps_symlink_target(self):
+        """Test that deleting a tree removes a symlink to a directory, not its contents"""
+        target = Path(self.test_dir) / "target"
+        target.mkdir()
+        (target / "keep.txt").write_text(self.test_content)
+        tree = Path(self.test_dir) / "tree"
+        tree.mkdir()
+        (tree / "link").symlink_to(target, target_is_directory=True)
+        
+        result = asyncio.run(delete_file(str(tree)))
+        
+        assert "Successfully deleted" in result
+        assert not tree.exists()
+        assert (target / "keep.txt").read_text() == self.test_content
+        
+    def test_read_large_text_file(self):
+        """Test reading a multi-megabyte text file"""
+        large_file = Path(self.test_dir) / "large.txt"
+        line = "line é\r\n".encode('utf-8')
+        line_count = LARGE_FILE_SIZE // len(line) + 1
+        large_file.write_bytes(line * line_count)
+        
+        result = asyncio.run(read_file(str(large_file)))
+        
+        assert result == "line é\n" * line_count
+        
+    def test_read_large_binary_file(self):
+        """Test reading a multi-megabyte binary file"""
+        large_file = Path(self.test_dir) / "large.bin"
+        data = bytes(range(256)) * (LARGE_FILE_SIZE // 256 + 1)
+        large_file.write_bytes(data)
+        
+        result = asyncio.run(read_file(str(large_file)))
+        
+        assert result == f"Binary file ({len(data)} bytes): {data[:100].hex()}..."
+        
+    def test_copy_file(self):
+        """Test copying a file keeps its content and permissions"""
+        self.test_file.write_text(self.test_content)
+        os.chmod(self.test_file, 0o640)
+        destination = Path(self.test_dir) / "copy.txt"
+        
+        file_manager.copy_file(self.test_file, destination)
+        
+        assert destination.read_text() == self.test_content
+        assert oct(destination.stat().st_mode)[-3:] == "640"
+        
+    @pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs procfs")
+    def test_copy_file_without_size(self):
+        """Test copying a file whose stat reports no size, like procfs files"""
+        destination = Path(self.test_dir) / "status.txt"
+        
+        file_manager.copy_file(Path("/proc/self/status"), destination)
+        
+        assert "Name:" in destination.read_text()
+        
+    def test_copy_directory(self):
+        """Test copying a directory tree"""
+        source = Path(self.test_dir) / "source"
+        (source / "nested").mkdir(parents=True)
+        (source / "nested" / "file.txt").write_text(self.test_content)
+        destination = Path(self.test_dir) / "destination"
+        
+        file_manager.copy_file(source, destination)
+        
+        assert (destination / "nested" / "file.txt").read_text() == self.test_content
+        
+    def test_copy_file_not_found(self):
+        """Test copying a non-existent file"""
+        with pytest.raises(FileNotFoundError, match="Source not found"):
+            file_manager.copy_file(Path(self.test_dir) / "missing.txt",
+                                   Path(self.test_dir) / "copy.txt")
+        
+    def test_move_file(self):
+        """Test moving a file"""
+        self.test_file.write_text(self.test_content)
+        destination = Path(self.test_dir) / "moved.txt"
+        
+        file_manager.move_file(self.test_file, destination)
+        
+        assert not self.test_file.exists()
+        assert destination.read_text() == self.test_content
+        
+    def test_move_file_source_not_found(self):
+        """Test moving a non-existent file"""
+        with pytest.raises(FileNotFoundError, match="Source not found"):
+            file_manager.move_file(Path(self.test_dir) / "missing.txt",
+                                   Path(self.test_dir) / "moved.txt")
+        
+    def test_move_file_destination_directory_missing(self):
+        """Test that a missing destination directory is not reported as a missing source"""
+        self.test_file.write_text(self.test_content)
+        
+        with pytest.raises(FileNotFoundError) as excinfo:
+            file_manager.move_file(self.test_file,
+                                   Path(self.test_dir) / "missing" / "moved.txt")
+        
+        assert "Source not found" not in str(excinfo.value)
+        assert self.test_file.exists()
+        
+    def test_iter_directory(self):
+        """Test iterating directory entries"""
+        (Path(self.test_dir) / "file1.txt").write_text("content1")
+        (Path(self.test_dir) / ".hidden").write_text("hidden content")
+        (Path(self.test_dir) / "subdir").mkdir()
+        
+        entries = {item['name']: item for item in file_manager.iter_directory(Path(self.test_dir))}
+        
+        assert set(entries) == {"file1.txt", "subdir"}
+        assert entries["subdir"]['is_dir']
+        assert entries["file1.txt"]['size'] == len("content1")
+        
+    def test_iter_directory_errors(self):
+        """Test that iter_directory raises at the call, before iteration"""
+        with pytest.raises(FileNotFoundError, match="Directory not found"):
+            file_manager.iter_directory(Path(self.test_dir) / "missing")
+        
+        self.test_file.write_text(self.test_content)
+        with pytest.raises(ValueError, match="not a directory"):
+            file_manager.iter_directory(self.test_file)
+        
     # Resource Tests
     def test_browse_directory_resource(self):
         """Test directory browsing resource"""
@@ -152,7 +300,7 @@ class TestFileSystemMCPServer:
         # Test resource
         import urllib.parse
         encoded_path = urllib.parse.quote(self.test_dir)
-        result = browse_directory(encoded_path)
+        result = asyncio.run(browse_directory(encoded_path))
         
         data = json.loads(result)
         assert "path" in data
@@ -167,7 +315,7 @@ class TestFileSystemMCPServer:
         # Test resource
         import urllib.parse
         encoded_path = urllib.parse.quote(str(self.test_file))
-        result = file_content(encoded_path)
+        result = asyncio.run(file_content(encoded_path))
         
         data = json.loads(result)
         assert "content" in data
@@ -178,7 +326,7 @@ class TestFileSystemMCPServer:
         """Test file content resource with directory (should error)"""
         import urllib.parse
         encoded_path = urllib.parse.quote(self.test_dir)
-        result = file_content(encoded_path)
+        result = asyncio.run(file_content(encoded_path))
         
         data = json.loads(result)
         assert "error" in data
@@ -242,7 +390,7 @@ class TestFileSystemMCPServer:
         ]
         
         for dangerous_path in dangerous_paths:
-            result = read_file(dangerous_path)
+            result = asyncio.run(read_file(dangerous_path))
             # Should either be blocked by security or fail safely
             assert "Error" in result or "Permission denied" in result
             
@@ -253,27 +401,27 @@ class TestFileSystemMCPServer:
         test_content = "This is a workflow test"
         
         # 1. Write file
-        write_result = write_file(test_file_path, test_content)
+        write_result = asyncio.run(write_file(test_file_path, test_content))
         assert "Successfully wrote" in write_result
         
         # 2. Read file
-        read_result = read_file(test_file_path)
+        read_result = asyncio.run(read_file(test_file_path))
         assert test_content in read_result
         
         # 3. List directory
-        list_result = list_directory(self.test_dir)
+        list_result = asyncio.run(list_directory(self.test_dir))
         assert "workflow_test.txt" in list_result
         
         # 4. Get file info
-        info_result = file_info(test_file_path)
+        info_result = asyncio.run(file_info(test_file_path))
         assert "File Information" in info_result
         
         # 5. Delete file
-        delete_result = delete_file(test_file_path)
+        delete_result = asyncio.run(delete_file(test_file_path))
         assert "Successfully deleted" in delete_result
         
         # 6. Verify deletion
-        final_list = list_directory(self.test_dir)
+        final_list = asyncio.run(list_directory(self.test_dir))
         assert "workflow_test.txt" not in final_list
 
 
@@ -295,11 +443,11 @@ class TestPerformance:
         test_file = Path(self.test_dir) / "large_file.txt"
         
         # Write large file
-        write_result = write_file(str(test_file), large_content)
+        write_result = asyncio.run(write_file(str(test_file), large_content))
         assert "Successfully wrote" in write_result
         
         # Read large file
-        read_result = read_file(str(test_file))
+        read_result = asyncio.run(read_file(str(test_file)))
         assert large_content in read_result
         
     def test_many_files_listing(self):
@@ -309,7 +457,7 @@ class TestPerformance:
             (Path(self.test_dir) / f"file_{i:03d}.txt").write_text(f"content {i}")
             
         # List directory
-        list_result = list_directory(self.test_dir)
+        list_result = asyncio.run(list_directory(self.test_dir))
         
         # Should contain all files
         for i in range(50):
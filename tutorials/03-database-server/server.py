@@ -6,8 +6,15 @@ Provides database operations through MCP protocol.
 Includes tools for queries, resources for schema browsing, and prompts for SQL generation.
 """
 
+import asyncio
+import functools
 import json
+import re
 import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
@@ -15,27 +22,128 @@ from db_manager import DatabaseManager
 from query_builder import QueryBuilder
 from schema import SchemaInspector
 
+# Optional faster JSON codec; orjson.JSONDecodeError subclasses
+# json.JSONDecodeError, so the handlers below catch either
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
 # Create MCP server
 mcp = FastMCP("Database")
 
+# Largest slice of a BLOB value included in table samples
+BLOB_PREVIEW_BYTES = 1024
+
+# Table and column names are spliced into SQL (they can't be bound), so only
+# plain identifiers are accepted
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def _max_bound_parameters() -> int:
+    """Return the bound parameters SQLite allows in one statement.
+    
+    Read from the linked SQLite library's SQLITE_LIMIT_VARIABLE_NUMBER:
+    32766 since 3.32, 999 before.
+    """
+    connection = sqlite3.connect(":memory:")
+    try:
+        return connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    except AttributeError:
+        # Connection.getlimit() is new in Python 3.11
+        return 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999
+    finally:
+        connection.close()
+
+# Bound parameters per INSERT statement; every insert is one statement, so
+# it stays atomic
+MAX_BOUND_PARAMETERS = _max_bound_parameters()
+
+# Most schema responses kept before the least recently used are evicted;
+# keys come from client-supplied database and table names
+SCHEMA_CACHE_MAXSIZE = 128
+
+# Serialized schema responses keyed by (database, table name or None for the
+# full schema), each stored with the PRAGMA schema_version it was read at, so
+# DDL from any connection (not only this server's tools) invalidates it
+_schema_cache: "OrderedDict[tuple, tuple[int, str]]" = OrderedDict()
+
+# Databases whose schema version can't be read (PRAGMA schema_version is
+# SQLite-only); their schema is always read uncached and never probed again
+_unversioned_databases: set = set()
+
 # Initialize components
 db_manager = DatabaseManager()
 query_builder = QueryBuilder()
 schema_inspector = SchemaInspector()
 
+# SQLite calls run on one dedicated thread, as aiosqlite does: the event loop
+# stays free for other clients and the shared connection is never used from
+# two threads at once
+db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+
+
+async def run_db(func, *args):
+    """Run a blocking database call on the database thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args))
+
+async def _schema_version(database: str) -> Optional[int]:
+    """Return the database's schema version, which SQLite bumps on every schema change.
+    
+    None means the version is unavailable and the schema must be read uncached.
+    """
+    if database in _unversioned_databases:
+        return None
+    try:
+        result = await run_db(db_manager.execute_query, "PRAGMA schema_version", [], database)
+        rows = result.get("data")
+        if rows:
+            return next(iter(rows[0].values()))
+    except Exception:
+        pass
+    # Names come from clients, so the set is emptied rather than left to grow
+    if len(_unversioned_databases) >= SCHEMA_CACHE_MAXSIZE:
+        _unversioned_databases.clear()
+    _unversioned_databases.add(database)
+    return None
+
+async def _cached_schema(key: tuple, func, *args) -> str:
+    """Return a cached schema response, re-reading it if the schema has changed."""
+    version = await _schema_version(key[0])
+    cached = _schema_cache.get(key)
+    if cached is not None and version is not None and cached[0] == version:
+        _schema_cache.move_to_end(key)
+        return cached[1]
+    
+    response = _dumps(await run_db(func, *args))
+    if version is not None:
+        _schema_cache[key] = (version, response)
+        _schema_cache.move_to_end(key)
+        if len(_schema_cache) > SCHEMA_CACHE_MAXSIZE:
+            _schema_cache.popitem(last=False)
+    return response
+
 # Database operation tools
 @mcp.tool()
-def execute_query(sql: str, params: str = "[]", database: str = "default") -> str:
+async def execute_query(sql: str, params: str = "[]", database: str = "default") -> str:
     """Execute a SQL query with optional parameters"""
     try:
         # Parse parameters
-        param_list = json.loads(params) if params else []
+        param_list = _loads(params) if params else []
         
-        result = db_manager.execute_query(sql, param_list, database)
+        result = await run_db(db_manager.execute_query, sql, param_list, database)
         
         if result["type"] == "select":
             return f"Query executed successfully. Rows returned: {len(result['data'])}\n" + \
-                   json.dumps(result["data"][:10], indent=2)  # Limit to first 10 rows
+                   _dumps(result["data"][:10])  # Limit to first 10 rows
         else:
             return f"Query executed successfully. Rows affected: {result.get('rows_affected', 0)}"
     
@@ -45,14 +153,14 @@ def execute_query(sql: str, params: str = "[]", database: str = "default") -> st
         return f"Error executing query: {str(e)}"
 
 @mcp.tool()
-def create_table(table_name: str, columns: str, database: str = "default") -> str:
+async def create_table(table_name: str, columns: str, database: str = "default") -> str:
     """Create a new table with specified columns"""
     try:
         # Parse column definitions
-        column_defs = json.loads(columns)
+        column_defs = _loads(columns)
         
-        sql = query_builder.build_create_table(table_name, column_defs)
-        result = db_manager.execute_query(sql, [], database)
+        sql = query_builder.build_create_table(_check_identifier(table_name), column_defs)
+        result = await run_db(db_manager.execute_query, sql, [], database)
         
         return f"Table '{table_name}' created successfully"
     
@@ -62,16 +170,34 @@ def create_table(table_name: str, columns: str, database: str = "default") -> st
         return f"Error creating table: {str(e)}"
 
 @mcp.tool()
-def insert_data(table_name: str, data: str, database: str = "default") -> str:
+async def insert_data(table_name: str, data: str, database: str = "default") -> str:
     """Insert data into a table"""
     try:
         # Parse data
-        records = json.loads(data)
+        records = _loads(data)
         if not isinstance(records, list):
             records = [records]
         
-        sql, params = query_builder.build_insert(table_name, records)
-        result = db_manager.execute_query(sql, params, database)
+        if not records or not all(isinstance(record, dict) and record for record in records):
+            return "Error: Data must be a non-empty JSON object or array of objects"
+        
+        # Records of one shape share a cached statement; the values are
+        # flattened straight into its parameter list
+        columns = tuple(sorted(records[0]))
+        if any(record.keys() != records[0].keys() for record in records):
+            return "Error: All records must have the same columns"
+        
+        # One statement (and one commit) for all records, so an insert is
+        # never left half-applied
+        if len(records) * len(columns) > MAX_BOUND_PARAMETERS:
+            return (f"Error: {len(records) * len(columns)} values exceed SQLite's limit of "
+                    f"{MAX_BOUND_PARAMETERS} per statement; insert fewer records per call")
+        
+        sql = _insert_sql(table_name, columns, len(records))
+        params = list(chain.from_iterable(
+            (record[column] for column in columns) for record in records
+        ))
+        await run_db(db_manager.execute_query, sql, params, database)
         
         return f"Inserted {len(records)} record(s) into '{table_name}'"
     
@@ -81,14 +207,14 @@ def insert_data(table_name: str, data: str, database: str = "default") -> str:
         return f"Error inserting data: {str(e)}"
 
 @mcp.tool()
-def update_data(table_name: str, set_values: str, where_clause: str = "", database: str = "default") -> str:
+async def update_data(table_name: str, set_values: str, where_clause: str = "", database: str = "default") -> str:
     """Update data in a table"""
     try:
         # Parse set values
-        values = json.loads(set_values)
+        values = _loads(set_values)
         
         sql, params = query_builder.build_update(table_name, values, where_clause)
-        result = db_manager.execute_query(sql, params, database)
+        result = await run_db(db_manager.execute_query, sql, params, database)
         
         return f"Updated {result.get('rows_affected', 0)} record(s) in '{table_name}'"
     
@@ -98,76 +224,134 @@ def update_data(table_name: str, set_values: str, where_clause: str = "", databa
         return f"Error updating data: {str(e)}"
 
 @mcp.tool()
-def delete_data(table_name: str, where_clause: str, database: str = "default") -> str:
-    """Delete data from a table"""
+async def delete_data(table_name: str, where_clause: str, database: str = "default") -> str:
+    """Delete data from a table
+    
+    where_clause is a JSON object of column values, e.g. {"id": 3}; rows
+    matching all of them are deleted.
+    """
     try:
         if not where_clause:
             return "Error: WHERE clause is required for DELETE operations (safety measure)"
         
-        sql = f"DELETE FROM {table_name} WHERE {where_clause}"
-        result = db_manager.execute_query(sql, [], database)
+        conditions = _loads(where_clause)
+        if not isinstance(conditions, dict) or not conditions:
+            return "Error: WHERE clause must be a non-empty JSON object of column values"
+        
+        sql = _delete_sql(table_name, tuple(conditions))
+        result = await run_db(db_manager.execute_query, sql, list(conditions.values()), database)
         
         return f"Deleted {result.get('rows_affected', 0)} record(s) from '{table_name}'"
     
+    except json.JSONDecodeError:
+        return "Error: WHERE clause must be valid JSON format"
     except Exception as e:
         return f"Error deleting data: {str(e)}"
 
 @mcp.tool()
-def backup_database(database: str = "default", backup_path: str = None) -> str:
+async def backup_database(database: str = "default", backup_path: str = None) -> str:
     """Create a backup of the database"""
     try:
-        backup_file = db_manager.backup_database(database, backup_path)
+        backup_file = await run_db(db_manager.backup_database, database, backup_path)
         return f"Database backed up to: {backup_file}"
     except Exception as e:
         return f"Error backing up database: {str(e)}"
 
 @mcp.tool()
-def get_table_info(table_name: str, database: str = "default") -> str:
+async def get_table_info(table_name: str, database: str = "default") -> str:
     """Get detailed information about a table"""
     try:
-        info = schema_inspector.get_table_info(table_name, database)
-        return json.dumps(info, indent=2)
+        return await _cached_schema((database, table_name),
+                                    schema_inspector.get_table_info, table_name, database)
     except Exception as e:
         return f"Error getting table info: {str(e)}"
 
+def _check_identifier(name: str) -> str:
+    """Return name if it is a plain SQL identifier, else raise ValueError."""
+    if not isinstance(name, str) or not IDENTIFIER_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
+
+@lru_cache(maxsize=256)
+def _delete_sql(table_name: str, columns: tuple) -> str:
+    """Build a DELETE with one bound parameter per WHERE column.
+    
+    The same table and columns always give the same SQL text, so SQLite's
+    statement cache reuses the prepared statement.
+    """
+    conditions = " AND ".join(f"{_check_identifier(column)} = ?" for column in columns)
+    return f"DELETE FROM {_check_identifier(table_name)} WHERE {conditions}"
+
+@lru_cache(maxsize=256)
+def _insert_parts(table_name: str, columns: tuple) -> tuple:
+    """Build the INSERT prefix and one row's placeholders for the given columns."""
+    column_list = ", ".join(_check_identifier(column) for column in columns)
+    row = "(" + ", ".join("?" * len(columns)) + ")"
+    return f"INSERT INTO {_check_identifier(table_name)} ({column_list}) VALUES ", row
+
+def _insert_sql(table_name: str, columns: tuple, row_count: int) -> str:
+    """Build a multi-row INSERT for row_count records with the given columns.
+    
+    Only the per-shape parts are cached: a statement for thousands of rows is
+    large, and joining the placeholders is cheap.
+    """
+    prefix, row = _insert_parts(table_name, columns)
+    return prefix + ", ".join([row] * row_count)
+
+@lru_cache(maxsize=256)
+def _sample_sql(table_name: str) -> str:
+    """Build the SELECT used for table data samples."""
+    return f"SELECT * FROM {_check_identifier(table_name)} LIMIT 50"
+
+def _preview_value(value: Any) -> Any:
+    """Replace a BLOB with its size and a hex preview of its first bytes."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {
+            "blob_bytes": len(value),
+            "preview": bytes(value[:BLOB_PREVIEW_BYTES]).hex()
+        }
+    return value
+
 # Database schema resources
 @mcp.resource("db://schema/{database}")
-def get_database_schema(database: str) -> str:
+async def get_database_schema(database: str) -> str:
     """Get complete database schema"""
     try:
-        schema = schema_inspector.get_full_schema(database)
-        return json.dumps(schema, indent=2)
+        return await _cached_schema((database, None), schema_inspector.get_full_schema, database)
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 @mcp.resource("db://table/{database}/{table_name}")
-def get_table_data(database: str, table_name: str) -> str:
+async def get_table_data(database: str, table_name: str) -> str:
     """Get sample data from a table"""
     try:
         # Get first 50 rows
-        result = db_manager.execute_query(
-            f"SELECT * FROM {table_name} LIMIT 50", 
-            [], 
-            database
-        )
+        result = await run_db(db_manager.execute_query, _sample_sql(table_name), [], database)
+        
+        # Wide BLOB columns would dominate the sample (and aren't JSON),
+        # so each one is cut down to a short preview
+        sample_data = [
+            {column: _preview_value(value) for column, value in row.items()}
+            for row in result["data"]
+        ]
         
-        return json.dumps({
+        return _dumps({
             "table": table_name,
-            "sample_data": result["data"],
-            "total_shown": len(result["data"])
-        }, indent=2)
+            "sample_data": sample_data,
+            "total_shown": len(sample_data)
+        })
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 @mcp.resource("db://query/{database}")
-def get_query_history(database: str) -> str:
+async def get_query_history(database: str) -> str:
     """Get recent query history for a database"""
     try:
-        history = db_manager.get_query_history(database)
-        return json.dumps({
+        history = await run_db(db_manager.get_query_history, database)
+        return _dumps({
             "database": database,
             "recent_queries": history
-        }, indent=2)
+        })
     except Exception as e:
         return json.dumps({"error": str(e)})
 
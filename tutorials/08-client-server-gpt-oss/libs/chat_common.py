@@ -0,0 +1,131 @@
+"""
+Shared helpers for the Streamlit chat client.
+Holds the LaTeX rendering helpers, LLM client setup and sidebar/message display
+so the entry point only has to wire up the page.
+"""
+import asyncio
+import os
+import re
+import streamlit as st
+from typing import AsyncIterator, Iterator
+from dotenv import load_dotenv
+
+from libs.local_llm_client import LocalLLMClient
+
+# Load environment variables before resolving configuration
+load_dotenv()
+
+# Resolved once at import; Streamlit reruns the script on every interaction
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+
+# Compiled once per process and shared by every importer
+_RE_TEXT = re.compile(r'\\text\{([^}]+)\}')
+_RE_FRAC = re.compile(r'\\frac\{([^}]+)\}\{([^}]+)\}')
+_SYMBOLS = {
+    r'\times': '×',
+    r'\cdot': '·',
+    r'\div': '÷',
+    r'\pm': '±',
+    r'\approx': '≈',
+    r'\neq': '≠',
+    r'\leq': '≤',
+    r'\geq': '≥',
+}
+_SYM_RE = re.compile('|'.join(re.escape(symbol) for symbol in _SYMBOLS))
+
+
+def render_math_content(content: str) -> str:
+    """Process content to convert LaTeX expressions to more readable format."""
+    # Every LaTeX marker starts with a backslash; plain prose needs no work
+    if "\\" not in content:
+        return content
+
+    # Replace \text{...} with regular text
+    content = _RE_TEXT.sub(r'\1', content)
+
+    # Replace \frac{a}{b} with a/b for simple fractions
+    content = _RE_FRAC.sub(r'(\1)/(\2)', content)
+
+    # Replace common math symbols (\times, \cdot, \div, ...) in a single pass
+    content = _SYM_RE.sub(lambda match: _SYMBOLS[match.group(0)], content)
+
+    return content
+
+
+def append_message(role: str, content: str) -> None:
+    """Add a chat message to the session, caching its rendered form.
+
+    The rendered copy lives in a parallel list so the message dicts stay
+    plain {"role", "content"} pairs when the history is sent to the LLM.
+    """
+    st.session_state.messages.append({"role": role, "content": content})
+    st.session_state.rendered_messages.append(render_math_content(content))
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return this session's event loop, creating it on first use.
+
+    Streamlit runs each session's script in its own thread, so one loop per
+    session is reused across prompts instead of building a new one every time.
+    """
+    loop = st.session_state.get("event_loop")
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        st.session_state.event_loop = loop
+    return loop
+
+
+def iterate_in_loop(stream: AsyncIterator[str]) -> Iterator[str]:
+    """Drive an async iterator on the session's event loop and yield its items synchronously."""
+    loop = get_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(stream.aclose())
+
+
+def initialize_llm_client():
+    """Initialize the LLM client with configuration from environment."""
+    try:
+        client = LocalLLMClient(provider=LLM_PROVIDER, model_name=MODEL_NAME)
+        return client
+    except Exception as e:
+        st.error(f"Failed to initialize LLM client: {e}")
+        return None
+
+
+def display_sidebar():
+    """Display sidebar with configuration and actions."""
+    with st.sidebar:
+        st.title("🤖 Local LLM Chat")
+
+        # Configuration
+        st.subheader("Configuration")
+        st.info(f"**Provider:** {LLM_PROVIDER}")
+        st.info(f"**Model:** {MODEL_NAME}")
+
+        # Status
+        st.subheader("Status")
+        if st.session_state.llm_client:
+            st.success("✅ Local LLM Ready")
+        else:
+            st.error("❌ Local LLM Not Available")
+
+        # Clear chat
+        st.subheader("Actions")
+        if st.button("🗑️ Clear Chat"):
+            st.session_state.messages = []
+            st.session_state.rendered_messages = []
+            st.rerun()
+
+
+def display_chat_messages():
+    """Display chat messages."""
+    for message, rendered in zip(st.session_state.messages, st.session_state.rendered_messages):
+        with st.chat_message(message["role"]):
+            st.markdown(rendered, unsafe_allow_html=True)
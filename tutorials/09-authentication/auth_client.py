@@ -6,14 +6,58 @@ Demonstrates how to connect to and authenticate with an MCP server.
 
 import asyncio
 import json
+import sys
+from functools import wraps
 from typing import Optional, Dict, Any
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# Optional faster JSON parser/serializer for tool responses
+try:
+    import orjson
+    loads = orjson.loads
+
+    def pretty(obj: Any) -> str:
+        """Format obj as indented JSON for display"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    loads = json.loads
+
+    def pretty(obj: Any) -> str:
+        """Format obj as indented JSON for display"""
+        return json.dumps(obj, indent=2)
+
+# Optional libuv-based event loop; speeds up the stdio pipes to the server process
+try:
+    import uvloop
+    run = uvloop.run
+except ImportError:
+    run = asyncio.run
+
+
+def _catch(default: Any, label: str):
+    """Decorator that reports any exception from an async client method and returns default"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                print(f"{label}: {e}")
+                return default
+        return wrapper
+    return decorator
+
 
 class AuthenticatedMCPClient:
     """MCP client with authentication capabilities"""
     
+    __slots__ = (
+        "server_command", "session", "authenticated", "current_user", "access_token", "api_key",
+        "stdio_client", "read", "write",
+        "_tools_cache", "_resources_cache", "_tools_task", "_resources_task",
+    )
+    
     def __init__(self, server_command: str = "mcp_server.py"):
         self.server_command = server_command
         self.session: Optional[ClientSession] = None
@@ -21,6 +65,14 @@ class AuthenticatedMCPClient:
         self.current_user = None
         self.access_token = None
         self.api_key = None
+        self.stdio_client = None
+        self.read = None
+        self.write = None
+        # Tool/resource catalogs are static for a session; cache them and share in-flight requests
+        self._tools_cache: Optional[list] = None
+        self._resources_cache: Optional[list] = None
+        self._tools_task: Optional[asyncio.Task] = None
+        self._resources_task: Optional[asyncio.Task] = None
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -45,208 +97,217 @@ class AuthenticatedMCPClient:
         await self.session.__aenter__()
         await self.session.initialize()
         
+        # Prefetch the tool/resource catalogs; list_tools()/list_resources() await these lazily
+        self._tools_task = asyncio.create_task(self.session.list_tools())
+        self._resources_task = asyncio.create_task(self.session.list_resources())
+        
         print("✅ Connected to MCP server")
     
     async def disconnect(self):
         """Disconnect from the MCP server"""
+        for task in (self._tools_task, self._resources_task):
+            if task and not task.done():
+                task.cancel()
+        self._tools_cache = self._resources_cache = None
+        self._tools_task = self._resources_task = None
         if self.session:
             await self.session.__aexit__(None, None, None)
-        if hasattr(self, 'stdio_client'):
+        if self.stdio_client:
             await self.stdio_client.__aexit__(None, None, None)
         print("🔌 Disconnected from MCP server")
     
+    async def _call_json(self, tool: str, arguments: Optional[Dict[str, Any]] = None, _loads=loads) -> Any:
+        """Call a tool and return its decoded JSON response
+
+        _loads binds the module-level parser as a fast local at definition time.
+        """
+        # ClientSession.call_tool accepts None, so argument-less tools skip building an empty dict
+        result = await self.session.call_tool(tool, arguments)
+        # TextContent only exposes the decoded str; orjson reads its UTF-8 buffer directly,
+        # so re-encoding to bytes first would add a copy rather than save one
+        return _loads(result.content[0].text)
+    
+    async def _call_noparse(self, tool: str, arguments: Optional[Dict[str, Any]] = None) -> None:
+        """Call a tool whose response the caller does not inspect"""
+        await self.session.call_tool(tool, arguments)
+    
+    @_catch(False, "❌ Login error")
     async def login_with_password(self, username: str, password: str) -> bool:
         """Authenticate using username and password"""
-        try:
-            result = await self.session.call_tool(
-                "authenticate_user",
-                {"username": username, "password": password}
-            )
-            
-            response = json.loads(result.content[0].text)
-            
-            if response.get("success"):
-                self.authenticated = True
-                self.current_user = response.get("user")
-                self.access_token = response.get("access_token")
-                print(f"✅ Logged in as {username} (Role: {self.current_user['role']})")
-                return True
-            else:
-                print(f"❌ Login failed: {response.get('error')}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Login error: {e}")
+        response = await self._call_json(
+            "authenticate_user",
+            {"username": username, "password": password}
+        )
+        
+        if response.get("success"):
+            self.authenticated = True
+            self.current_user = response.get("user")
+            self.access_token = response.get("access_token")
+            print(f"✅ Logged in as {username} (Role: {self.current_user['role']})")
+            return True
+        else:
+            print(f"❌ Login failed: {response.get('error')}")
             return False
     
+    @_catch(False, "❌ API key authentication error")
     async def login_with_api_key(self, api_key: str) -> bool:
         """Authenticate using API key"""
-        try:
-            result = await self.session.call_tool(
-                "authenticate_with_api_key",
-                {"api_key": api_key}
-            )
-            
-            response = json.loads(result.content[0].text)
-            
-            if response.get("success"):
-                self.authenticated = True
-                self.current_user = response.get("user")
-                self.api_key = api_key
-                print(f"✅ Authenticated with API key (User: {self.current_user['username']})")
-                return True
-            else:
-                print(f"❌ API key authentication failed: {response.get('error')}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ API key authentication error: {e}")
+        response = await self._call_json(
+            "authenticate_with_api_key",
+            {"api_key": api_key}
+        )
+        
+        if response.get("success"):
+            self.authenticated = True
+            self.current_user = response.get("user")
+            self.api_key = api_key
+            print(f"✅ Authenticated with API key (User: {self.current_user['username']})")
+            return True
+        else:
+            print(f"❌ API key authentication failed: {response.get('error')}")
             return False
     
+    @_catch(False, "❌ Logout error")
     async def logout(self) -> bool:
         """Logout current user"""
-        try:
-            result = await self.session.call_tool("logout", {})
-            response = json.loads(result.content[0].text)
-            
-            if response.get("success"):
-                self.authenticated = False
-                self.current_user = None
-                self.access_token = None
-                self.api_key = None
-                print("✅ Logged out successfully")
-                return True
-            else:
-                print(f"❌ Logout failed: {response.get('message')}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Logout error: {e}")
+        response = await self._call_json("logout")
+        
+        if response.get("success"):
+            self.authenticated = False
+            self.current_user = None
+            self.access_token = None
+            self.api_key = None
+            print("✅ Logged out successfully")
+            return True
+        else:
+            print(f"❌ Logout failed: {response.get('message')}")
             return False
     
+    @_catch(False, "❌ Logout error")
+    async def logout_noreply(self) -> bool:
+        """Logout current user without decoding the server's reply"""
+        await self._call_noparse("logout")
+        self.authenticated = False
+        self.current_user = None
+        self.access_token = None
+        self.api_key = None
+        return True
+    
+    @_catch(None, "❌ Profile error")
     async def get_user_profile(self) -> Optional[Dict[str, Any]]:
         """Get current user's profile"""
-        try:
-            result = await self.session.call_tool("get_user_profile", {})
-            response = json.loads(result.content[0].text)
-            
-            if "error" in response:
-                print(f"❌ Profile access denied: {response['error']}")
-                return None
-            
-            return response
-            
-        except Exception as e:
-            print(f"❌ Profile error: {e}")
+        response = await self._call_json("get_user_profile")
+        
+        if "error" in response:
+            print(f"❌ Profile access denied: {response['error']}")
             return None
+        
+        return response
     
+    @_catch(None, "❌ Note creation error")
     async def create_secure_note(self, title: str, content: str) -> Optional[Dict[str, Any]]:
         """Create a secure note"""
-        try:
-            result = await self.session.call_tool(
-                "create_secure_note",
-                {"title": title, "content": content}
-            )
-            response = json.loads(result.content[0].text)
-            
-            if "error" in response:
-                print(f"❌ Note creation failed: {response['error']}")
-                return None
-            
-            return response
-            
-        except Exception as e:
-            print(f"❌ Note creation error: {e}")
+        response = await self._call_json(
+            "create_secure_note",
+            {"title": title, "content": content}
+        )
+        
+        if "error" in response:
+            print(f"❌ Note creation failed: {response['error']}")
             return None
+        
+        return response
     
+    @_catch(None, "❌ API key creation error")
     async def create_api_key(self, name: str, permissions: list = None, expires_days: int = None) -> Optional[str]:
         """Create a new API key"""
-        try:
+        if permissions and expires_days:
+            # Fully specified call (the common case): build the arguments in one literal
+            args = {"name": name, "permissions": permissions, "expires_days": expires_days}
+        else:
             args = {"name": name}
             if permissions:
                 args["permissions"] = permissions
             if expires_days:
                 args["expires_days"] = expires_days
-            
-            result = await self.session.call_tool("create_api_key", args)
-            response = json.loads(result.content[0].text)
-            
-            if response.get("success"):
-                api_key = response.get("api_key")
-                print(f"✅ Created API key '{name}': {api_key}")
-                return api_key
-            else:
-                print(f"❌ API key creation failed: {response.get('error')}")
-                return None
-                
-        except Exception as e:
-            print(f"❌ API key creation error: {e}")
+        
+        response = await self._call_json("create_api_key", args)
+        
+        if response.get("success"):
+            api_key = response.get("api_key")
+            print(f"✅ Created API key '{name}': {api_key}")
+            return api_key
+        else:
+            print(f"❌ API key creation failed: {response.get('error')}")
             return None
     
+    @_catch(None, "❌ Audit events error")
     async def list_audit_events(self, limit: int = 10) -> Optional[list]:
         """List audit events (admin only)"""
-        try:
-            result = await self.session.call_tool(
-                "list_audit_events",
-                {"limit": limit}
-            )
-            response = json.loads(result.content[0].text)
-            
-            if "error" in response:
-                print(f"❌ Audit access denied: {response['error']}")
-                return None
-            
-            return response
-            
-        except Exception as e:
-            print(f"❌ Audit events error: {e}")
+        response = await self._call_json(
+            "list_audit_events",
+            {"limit": limit}
+        )
+        
+        if "error" in response:
+            print(f"❌ Audit access denied: {response['error']}")
             return None
+        
+        return response
     
+    @_catch(None, "❌ Security summary error")
     async def get_security_summary(self, hours: int = 24) -> Optional[Dict[str, Any]]:
         """Get security summary (admin only)"""
-        try:
-            result = await self.session.call_tool(
-                "get_security_summary",
-                {"hours": hours}
-            )
-            response = json.loads(result.content[0].text)
-            
-            if "error" in response:
-                print(f"❌ Security summary access denied: {response['error']}")
-                return None
-            
-            return response
-            
-        except Exception as e:
-            print(f"❌ Security summary error: {e}")
+        response = await self._call_json(
+            "get_security_summary",
+            {"hours": hours}
+        )
+        
+        if "error" in response:
+            print(f"❌ Security summary access denied: {response['error']}")
             return None
+        
+        return response
     
     async def list_tools(self) -> list:
-        """List available tools"""
+        """List available tools (cached for the session)"""
+        if self._tools_cache is not None:
+            return self._tools_cache
         try:
-            tools = await self.session.list_tools()
-            return [tool.name for tool in tools.tools]
+            # Concurrent first callers await the same request
+            if self._tools_task is None:
+                self._tools_task = asyncio.create_task(self.session.list_tools())
+            tools = await self._tools_task
+            self._tools_cache = [tool.name for tool in tools.tools]
+            return self._tools_cache
         except Exception as e:
             print(f"❌ Tools listing error: {e}")
             return []
+        finally:
+            self._tools_task = None
     
     async def list_resources(self) -> list:
-        """List available resources"""
+        """List available resources (cached for the session)"""
+        if self._resources_cache is not None:
+            return self._resources_cache
         try:
-            resources = await self.session.list_resources()
-            return [str(res.uri) for res in resources.resources]
+            # Concurrent first callers await the same request
+            if self._resources_task is None:
+                self._resources_task = asyncio.create_task(self.session.list_resources())
+            resources = await self._resources_task
+            self._resources_cache = [str(res.uri) for res in resources.resources]
+            return self._resources_cache
         except Exception as e:
             print(f"❌ Resources listing error: {e}")
             return []
+        finally:
+            self._resources_task = None
     
+    @_catch(None, "❌ Resource read error")
     async def read_resource(self, uri: str) -> Optional[str]:
         """Read a resource"""
-        try:
-            result = await self.session.read_resource(uri)
-            return result.contents[0].text
-        except Exception as e:
-            print(f"❌ Resource read error: {e}")
-            return None
+        result = await self.session.read_resource(uri)
+        return result.contents[0].text
 
 
 async def demo_authentication_flow():
@@ -256,28 +317,37 @@ async def demo_authentication_flow():
     
     async with AuthenticatedMCPClient() as client:
         
+        # Discover tools and resources concurrently
+        tools, resources = await asyncio.gather(client.list_tools(), client.list_resources())
+        
         # Show available tools
         print("\n📋 Available tools:")
-        tools = await client.list_tools()
-        for tool in tools:
-            print(f"  - {tool}")
+        if tools:
+            print("\n".join(f"  - {tool}" for tool in tools))
         
         # Show available resources
         print("\n📚 Available resources:")
-        resources = await client.list_resources()
-        for resource in resources:
-            print(f"  - {resource}")
+        if resources:
+            print("\n".join(f"  - {resource}" for resource in resources))
+        
+        sys.stdout.flush()
         
         # Test 1: Login with admin credentials
         print("\n1️⃣  Testing admin login...")
         success = await client.login_with_password("admin", "admin123")
         
         if success:
+            # Profile and admin lookups are independent reads; issue them together
+            profile, events, summary = await asyncio.gather(
+                client.get_user_profile(),
+                client.list_audit_events(3),
+                client.get_security_summary(1)
+            )
+            
             # Get user profile
             print("\n👤 User Profile:")
-            profile = await client.get_user_profile()
             if profile:
-                print(json.dumps(profile, indent=2))
+                print(pretty(profile))
             
             # Create a secure note
             print("\n📝 Creating secure note...")
@@ -290,11 +360,9 @@ async def demo_authentication_flow():
             
             # Test admin functions
             print("\n🔍 Testing admin functions...")
-            events = await client.list_audit_events(3)
             if events:
                 print(f"Found {len(events)} audit events")
             
-            summary = await client.get_security_summary(1)
             if summary:
                 print("Security summary retrieved")
             
@@ -317,6 +385,8 @@ async def demo_authentication_flow():
                     if profile:
                         print(f"API key login successful for: {profile['username']}")
         
+        sys.stdout.flush()
+        
         # Test 2: Regular user login
         print("\n2️⃣  Testing regular user login...")
         await client.logout()
@@ -330,52 +400,99 @@ async def demo_authentication_flow():
                 print("✅ Access control working - regular user denied admin access")
         
         print("\n✅ Demo completed!")
+        sys.stdout.flush()
+
+
+# Interactive prompts and help text
+_COMMAND_PROMPT = "\n> "
+_USERNAME_PROMPT = "Username: "
+_PASSWORD_PROMPT = "Password: "
+_NOTE_TITLE_PROMPT = "Note title: "
+_NOTE_CONTENT_PROMPT = "Note content: "
+_API_KEY_NAME_PROMPT = "API key name: "
+_COMMANDS_LINE = "Commands: login, profile, note, apikey, audit, summary, logout, quit"
+_HELP = "Unknown command. Available: login, profile, note, apikey, audit, summary, logout, quit"
+
+
+async def _ainput(prompt: str = "") -> str:
+    """Read a line from stdin without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+async def _do_login(client: AuthenticatedMCPClient):
+    username = await _ainput(_USERNAME_PROMPT)
+    password = await _ainput(_PASSWORD_PROMPT)
+    await client.login_with_password(username, password)
+
+
+async def _do_profile(client: AuthenticatedMCPClient):
+    profile = await client.get_user_profile()
+    if profile:
+        print(pretty(profile))
+
+
+async def _do_note(client: AuthenticatedMCPClient):
+    title = await _ainput(_NOTE_TITLE_PROMPT)
+    content = await _ainput(_NOTE_CONTENT_PROMPT)
+    note = await client.create_secure_note(title, content)
+    if note:
+        print(f"Created: {note['title']}")
+
+
+async def _do_apikey(client: AuthenticatedMCPClient):
+    name = await _ainput(_API_KEY_NAME_PROMPT)
+    api_key = await client.create_api_key(name)
+    if api_key:
+        print(f"API Key: {api_key}")
+
+
+async def _do_audit(client: AuthenticatedMCPClient):
+    events = await client.list_audit_events(5)
+    if events:
+        print(pretty(events))
+
+
+async def _do_summary(client: AuthenticatedMCPClient):
+    summary = await client.get_security_summary()
+    if summary:
+        print(pretty(summary))
+
+
+async def _do_logout(client: AuthenticatedMCPClient):
+    await client.logout()
+
+
+# Interactive command dispatch table ("quit" is handled by the loop itself)
+_COMMANDS = {
+    "login": _do_login,
+    "profile": _do_profile,
+    "note": _do_note,
+    "apikey": _do_apikey,
+    "audit": _do_audit,
+    "summary": _do_summary,
+    "logout": _do_logout,
+}
 
 
 async def interactive_client():
     """Interactive MCP client for manual testing"""
     print("🎮 Interactive MCP Authentication Client")
     print("=" * 50)
-    print("Commands: login, profile, note, apikey, audit, summary, logout, quit")
+    print(_COMMANDS_LINE)
     
     async with AuthenticatedMCPClient() as client:
         while True:
             try:
-                command = input("\n> ").strip().lower()
+                command = (await _ainput(_COMMAND_PROMPT)).strip().lower()
                 
                 if command == "quit":
                     break
-                elif command == "login":
-                    username = input("Username: ")
-                    password = input("Password: ")
-                    await client.login_with_password(username, password)
-                elif command == "profile":
-                    profile = await client.get_user_profile()
-                    if profile:
-                        print(json.dumps(profile, indent=2))
-                elif command == "note":
-                    title = input("Note title: ")
-                    content = input("Note content: ")
-                    note = await client.create_secure_note(title, content)
-                    if note:
-                        print(f"Created: {note['title']}")
-                elif command == "apikey":
-                    name = input("API key name: ")
-                    api_key = await client.create_api_key(name)
-                    if api_key:
-                        print(f"API Key: {api_key}")
-                elif command == "audit":
-                    events = await client.list_audit_events(5)
-                    if events:
-                        print(json.dumps(events, indent=2))
-                elif command == "summary":
-                    summary = await client.get_security_summary()
-                    if summary:
-                        print(json.dumps(summary, indent=2))
-                elif command == "logout":
-                    await client.logout()
-                else:
-                    print("Unknown command. Available: login, profile, note, apikey, audit, summary, logout, quit")
+                
+                handler = _COMMANDS.get(command)
+                if handler is None:
+                    print(_HELP)
+                    continue
+                await handler(client)
                     
             except KeyboardInterrupt:
                 break
@@ -384,9 +501,9 @@ async def interactive_client():
 
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == "interactive":
-        asyncio.run(interactive_client())
+        run(interactive_client())
     else:
-        asyncio.run(demo_authentication_flow())
+        # Buffer demo output and flush at phase boundaries instead of per line
+        sys.stdout.reconfigure(line_buffering=False)
+        run(demo_authentication_flow())
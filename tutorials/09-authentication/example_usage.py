@@ -5,126 +5,127 @@ Demonstrates various authentication scenarios and use cases.
 """
 
 import asyncio
-import json
-from auth_client import AuthenticatedMCPClient
+import os
+import sys
+from auth_client import AuthenticatedMCPClient, pretty, run
+from libs.auth_manager import AuthManager, UserRole
 
 
-async def example_basic_auth():
+async def example_basic_auth(client: AuthenticatedMCPClient):
     """Example: Basic username/password authentication"""
     print("🔐 Example: Basic Authentication")
     print("-" * 40)
     
-    async with AuthenticatedMCPClient() as client:
-        # Login with default admin credentials
-        success = await client.login_with_password("admin", "admin123")
+    # Login with default admin credentials
+    success = await client.login_with_password("admin", "admin123")
+    
+    if success:
+        # Get user profile
+        profile = await client.get_user_profile()
+        print("User Profile:", pretty(profile))
         
-        if success:
-            # Get user profile
-            profile = await client.call_tool("get_user_profile")
-            print("User Profile:", json.dumps(profile, indent=2))
-            
-            # Create a secure note
-            note = await client.call_tool("create_secure_note", {
-                "title": "Welcome Note",
-                "content": "This is a secure note created after authentication"
-            })
-            print("Created Note:", json.dumps(note, indent=2))
+        # Create a secure note
+        note = await client.create_secure_note(
+            title="Welcome Note",
+            content="This is a secure note created after authentication"
+        )
+        print("Created Note:", pretty(note))
 
 
-async def example_api_key_workflow():
+async def example_api_key_workflow(client: AuthenticatedMCPClient):
     """Example: Complete API key workflow"""
     print("\n🔑 Example: API Key Workflow")
     print("-" * 40)
     
-    async with AuthenticatedMCPClient() as client:
-        # Step 1: Login with password to create API key
-        await client.login_with_password("admin", "admin123")
-        
-        # Step 2: Create API key
-        api_key = await client.create_api_key(
-            name="automation_key",
-            permissions=["read", "write", "create"],
-            expires_days=30
-        )
+    # Step 1: Login with password to create API key
+    await client.login_with_password("admin", "admin123")
+    
+    # Step 2: Create API key
+    api_key = await client.create_api_key(
+        name="automation_key",
+        permissions=["read", "write", "create"],
+        expires_days=30
+    )
+    
+    if api_key:
+        # Step 3: Clear JWT token and use API key
+        client.access_token = None
+        await client.login_with_api_key(api_key)
         
-        if api_key:
-            # Step 3: Clear JWT token and use API key
-            client.access_token = None
-            await client.login_with_api_key(api_key)
-            
-            # Step 4: Use API key for operations
-            profile = await client.call_tool("get_user_profile")
-            print("Profile via API Key:", json.dumps(profile, indent=2))
+        # Step 4: Use API key for operations
+        profile = await client.get_user_profile()
+        print("Profile via API Key:", pretty(profile))
 
 
-async def example_user_management():
+async def example_user_management(client: AuthenticatedMCPClient):
     """Example: User registration and management"""
     print("\n👥 Example: User Management")
     print("-" * 40)
     
-    async with AuthenticatedMCPClient() as client:
-        # Register new user
-        success = await client.register_user(
+    # The server exposes no registration tool; register the user directly
+    # in the database the server reads (None if it already exists)
+    manager = AuthManager(os.getenv("DATABASE_PATH", "./auth.db"))
+    try:
+        await manager.create_user(
             username="testuser",
             email="test@example.com",
             password="TestPass123!",
-            role="user"
+            role=UserRole.USER
         )
+    finally:
+        await manager.close()
+    
+    # Login as new user
+    if await client.login_with_password("testuser", "TestPass123!"):
+        # Try to access user-level resources
+        profile = await client.get_user_profile()
+        print("New User Profile:", pretty(profile))
         
-        if success:
-            # Login as new user
-            await client.login_with_password("testuser", "TestPass123!")
-            
-            # Try to access user-level resources
-            profile = await client.call_tool("get_user_profile")
-            print("New User Profile:", json.dumps(profile, indent=2))
-            
-            # Try admin function (should fail)
-            audit_events = await client.call_tool("list_audit_events")
-            if not audit_events:
-                print("✅ Correctly denied admin access to regular user")
+        # Try admin function (should fail)
+        audit_events = await client.list_audit_events()
+        if not audit_events:
+            print("✅ Correctly denied admin access to regular user")
 
 
-async def example_security_monitoring():
+async def example_security_monitoring(client: AuthenticatedMCPClient):
     """Example: Security monitoring and audit logs"""
     print("\n🛡️  Example: Security Monitoring")
     print("-" * 40)
     
-    async with AuthenticatedMCPClient() as client:
-        # Login as admin
-        await client.login_with_password("admin", "admin123")
-        
-        # Get security summary
-        summary = await client.call_tool("get_security_summary", {"hours": 1})
-        if summary:
-            print("Security Summary:", json.dumps(summary, indent=2))
-        
-        # Get recent audit events
-        events = await client.call_tool("list_audit_events", {"limit": 5})
-        if events:
-            print("Recent Events:", json.dumps(events, indent=2))
+    # Login as admin
+    await client.login_with_password("admin", "admin123")
+    
+    # Get security summary and recent audit events concurrently
+    summary, events = await asyncio.gather(
+        client.get_security_summary(hours=1),
+        client.list_audit_events(limit=5)
+    )
+    if summary:
+        print("Security Summary:", pretty(summary))
+    
+    if events:
+        print("Recent Events:", pretty(events))
 
 
-async def example_error_handling():
+async def example_error_handling(client: AuthenticatedMCPClient):
     """Example: Error handling and security scenarios"""
     print("\n⚠️  Example: Error Handling")
     print("-" * 40)
     
-    async with AuthenticatedMCPClient() as client:
-        # Test invalid credentials
-        print("Testing invalid login...")
-        success = await client.login_with_password("invalid", "wrong")
-        print(f"Invalid login result: {success}")
-        
-        # Test unauthenticated access
-        print("Testing unauthenticated access...")
-        result = await client.call_tool("get_user_profile")
-        print(f"Unauthenticated access result: {result}")
-        
-        # Test invalid API key
-        print("Testing invalid API key...")
-        success = await client.login_with_api_key("invalid_key_12345")
-        print(f"Invalid API key result: {success}")
+    # Test invalid credentials
+    print("Testing invalid login...")
+    success = await client.login_with_password("invalid", "wrong")
+    print(f"Invalid login result: {success}")
+    
+    # Test unauthenticated access
+    print("Testing unauthenticated access...")
+    result = await client.get_user_profile()
+    print(f"Unauthenticated access result: {result}")
+    
+    # Test invalid API key
+    print("Testing invalid API key...")
+    success = await client.login_with_api_key("invalid_key_12345")
+    print(f"Invalid API key result: {success}")
 
 
 async def run_all_examples():
@@ -133,18 +134,31 @@ async def run_all_examples():
     print("=" * 50)
     
     try:
-        await example_basic_auth()
-        await example_api_key_workflow()
-        await example_user_management()
-        await example_security_monitoring()
-        await example_error_handling()
+        # One server process and MCP session is shared by every example
+        async with AuthenticatedMCPClient() as client:
+            examples = (
+                example_basic_auth,
+                example_api_key_workflow,
+                example_user_management,
+                example_security_monitoring,
+                example_error_handling,
+            )
+            for example in examples:
+                await example(client)
+                # Reset authentication state before the next example
+                await client.logout_noreply()
+                sys.stdout.flush()
         
         print("\n✅ All examples completed successfully!")
         
     except Exception as e:
         print(f"\n❌ Error running examples: {e}")
         print("Make sure the MCP server is running with: python auth_server.py")
+    finally:
+        sys.stdout.flush()
 
 
 if __name__ == "__main__":
-    asyncio.run(run_all_examples())
+    # Buffer example output and flush once per example instead of per line
+    sys.stdout.reconfigure(line_buffering=False)
+    run(run_all_examples())
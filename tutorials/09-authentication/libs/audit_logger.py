@@ -6,12 +6,77 @@ Provides comprehensive security event logging and monitoring.
 import asyncio
 import json
 import logging
-from datetime import datetime
+import os
+import re
+from contextlib import asynccontextmanager
+from pathlib import Path
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import aiosqlite
 
+# Optional faster JSON serializer; orjson encodes datetime natively
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _json_default(obj: Any) -> str:
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_json_default).encode()
+
+    _loads = json.loads
+
+# Number of queued events after which the writer stops collecting and commits
+# (a multi-event entry from log_events is never split across transactions)
+_BATCH_SIZE = 256
+
+# How long the writer keeps collecting events after the first one before committing
+_GROUP_COMMIT_SECONDS = 0.02
+
+# Upper bound on entries waiting for the writer; logging applies backpressure beyond it
+_QUEUE_MAXSIZE = 10000
+
+# Attempts at writing one batch (each waits out busy_timeout for the lock) before the
+# writer gives up, keeping the batch for the next writer
+_WRITE_ATTEMPTS = 3
+
+# Pause before the first retry of a failed batch, doubled for each further retry
+_RETRY_DELAY_SECONDS = 0.1
+
+# One SQL string for every batch so the writer connection's statement cache
+# reuses the same prepared statement instead of re-parsing it
+_INSERT_EVENT_SQL = """
+    INSERT INTO audit_events (
+        event_type, level, user_id, username, resource, action,
+        details, client_info, success, error_message, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Pages of WAL accumulated before the writer checkpoints (SQLite's default is 1000)
+_WAL_AUTOCHECKPOINT_PAGES = 10000
+
+# Monthly archive databases written by archive_events, named after their month (YYYYMM)
+_ARCHIVE_NAME = re.compile(r"audit-(\d{6})\.db")
+
+# Read-only connections kept open for queries; SQLite allows many readers alongside the writer
+_READ_POOL_SIZE = 2
+
+# Per-connection tuning; journal_mode=WAL is set once in init_db and persists in the file
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+)
+
+logger = logging.getLogger(__name__)
+
 
 class AuditEventType(str, Enum):
     """Types of audit events"""
@@ -50,6 +115,7 @@ class AuditEventType(str, Enum):
     SERVER_START = "server_start"
     SERVER_STOP = "server_stop"
     CONFIG_CHANGE = "config_change"
+    SYSTEM_ERROR = "system_error"
 
 
 class AuditLevel(str, Enum):
@@ -60,9 +126,9 @@ class AuditLevel(str, Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AuditEvent:
-    """Audit event data structure"""
+    """Audit event data structure (immutable, no per-instance __dict__)"""
     event_type: AuditEventType
     level: AuditLevel
     user_id: Optional[int]
@@ -76,10 +142,21 @@ class AuditEvent:
     error_message: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        """Convert to dictionary for JSON serialization (timestamp stays a datetime)"""
+        # Built by hand: asdict() deep-copies details/client_info, which are only read
+        return {
+            "event_type": self.event_type,
+            "level": self.level,
+            "user_id": self.user_id,
+            "username": self.username,
+            "resource": self.resource,
+            "action": self.action,
+            "details": self.details,
+            "client_info": self.client_info,
+            "timestamp": self.timestamp,
+            "success": self.success,
+            "error_message": self.error_message,
+        }
 
 
 class AuditLogger:
@@ -88,34 +165,39 @@ class AuditLogger:
     def __init__(self, db_path: str = "./auth.db", log_file: str = "./logs/audit.log"):
         self.db_path = db_path
         self.log_file = log_file
-        self.logger = self._setup_file_logger()
+        # Audit log lines are appended straight to one buffered file, flushed after each write;
+        # opened on first use and closed by close(), so the logger can be reused afterwards
+        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        self._log_fp = None
         self._db_initialized = False
+        # Events are queued and written in batches by one background task per event loop
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # Queue entries taken by a writer that failed before writing them; the next writer
+        # on the same event loop writes them first, then carries on with the queue
+        self._unwritten: List[list] = []
+        # Pooled read-only connections for queries, bound to the event loop that opened them
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._read_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._read_conns: List[aiosqlite.Connection] = []
     
-    def _setup_file_logger(self) -> logging.Logger:
-        """Set up file-based logging"""
-        logger = logging.getLogger("audit")
-        logger.setLevel(logging.INFO)
-        
-        # Create logs directory if it doesn't exist
-        import os
-        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
-        
-        # File handler
-        file_handler = logging.FileHandler(self.log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # JSON formatter for structured logging
-        formatter = logging.Formatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "message": %(message)s}'
-        )
-        file_handler.setFormatter(formatter)
-        
-        logger.addHandler(file_handler)
-        return logger
+    async def _configure(self, db: aiosqlite.Connection, read_only: bool = False):
+        """Apply connection PRAGMAs; read-only connections never take the write lock"""
+        for pragma in _CONNECTION_PRAGMAS:
+            await db.execute(pragma)
+        if read_only:
+            await db.execute("PRAGMA query_only=1")
     
     async def init_db(self):
         """Initialize audit database tables"""
         async with aiosqlite.connect(self.db_path) as db:
+            # WAL lets readers run alongside the batched writer
+            cursor = await db.execute("PRAGMA journal_mode=WAL")
+            journal_mode = (await cursor.fetchone())[0]
+            if journal_mode.lower() != "wal":
+                self._write_log_line("WARNING", {"warning": f"WAL unavailable, journal_mode={journal_mode}"})
+            await self._configure(db)
+            
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS audit_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -149,57 +231,350 @@ class AuditLogger:
                 ON audit_events(event_type, timestamp)
             """)
             
+            # Serves event_type filters combined with user_id and newest-first ordering
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_audit_et_user_ts 
+                ON audit_events(event_type, user_id, timestamp DESC, id)
+            """)
+            
+            # Covering indexes for the security summary: its time-window aggregates are
+            # answered from the index alone, without touching table rows
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_audit_ts_type_success 
+                ON audit_events(timestamp, event_type, success)
+            """)
+            
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_audit_ts_username 
+                ON audit_events(timestamp, username)
+            """)
+            
             await db.commit()
         
         self._db_initialized = True
     
     async def log_event(self, event: AuditEvent):
         """Log an audit event to both database and file"""
+        await self.log_events([event])
+    
+    async def log_events(self, events: List[AuditEvent]):
+        """Log several audit events as one unit, written in the same batch"""
         if not self._db_initialized:
             await self.init_db()
         
-        # Log to database
-        await self._log_to_database(event)
+        # Serialize here and hand the database rows and log lines to the writer as one
+        # queue entry; put() only waits when the queue is full
+        await self._ensure_writer().put(
+            [(self._event_row(event), self._event_line(event)) for event in events]
+        )
+    
+    def _event_row(self, event: AuditEvent) -> tuple:
+        """Serialize an event into an audit_events row"""
+        # The enums subclass str, so sqlite3 binds them as TEXT without a .value lookup
+        return (
+            event.event_type,
+            event.level,
+            event.user_id,
+            event.username,
+            event.resource,
+            event.action,
+            _dumps(event.details).decode(),
+            _dumps(event.client_info).decode(),
+            event.success,
+            event.error_message,
+            event.timestamp
+        )
+    
+    def _writer_running(self) -> bool:
+        """Check whether the background writer is alive on the running event loop"""
+        return self._writer_on_loop() and not self._writer.done()
+    
+    def _writer_on_loop(self) -> bool:
+        """Check whether the current writer, alive or not, belongs to the running event loop"""
+        return self._writer is not None and self._writer.get_loop() is asyncio.get_running_loop()
+    
+    def _ensure_writer(self) -> asyncio.Queue:
+        """Start the background database writer for the running event loop if needed"""
+        if not self._writer_running():
+            if self._writer_on_loop():
+                # The writer died; a new one resumes its unwritten batch and queue.
+                # Its error is retrieved here so it is not reported as unhandled
+                if not self._writer.cancelled():
+                    self._writer.exception()
+            else:
+                self._queue = asyncio.Queue(maxsize=_QUEUE_MAXSIZE)
+                self._unwritten = []
+            self._writer = asyncio.create_task(self._drain(self._queue, self._unwritten))
+            self._unwritten = []
+        return self._queue
+    
+    async def _drain(self, queue: asyncio.Queue, unwritten: List[list]):
+        """Write queued events in batches over one long-lived connection
         
-        # Log to file
-        self._log_to_file(event)
+        Events go to the database first and then to the log file. A batch that still
+        fails after retries stops the writer, and is kept (with the rest of the queue)
+        for the next one; flush() and close() raise the error.
+        """
+        loop = asyncio.get_running_loop()
+        entries = unwritten
+        try:
+            # Each batch's implicit transaction opens with BEGIN IMMEDIATE, taking the write lock
+            # up front (waiting out busy_timeout) rather than failing on a mid-batch lock upgrade
+            async with aiosqlite.connect(self.db_path, isolation_level="IMMEDIATE") as db:
+                await self._configure(db)
+                # Fewer, larger checkpoints; the group commit below keeps commits infrequent too
+                await db.execute(f"PRAGMA wal_autocheckpoint={_WAL_AUTOCHECKPOINT_PAGES}")
+                while True:
+                    if not entries:
+                        entries = await self._next_batch(queue, loop)
+                    items = [item for entry in entries for item in entry]
+                    
+                    # One prepared INSERT and one transaction (one fsync) for the whole batch
+                    await self._write_batch(db, [row for row, _ in items])
+                    
+                    try:
+                        # One write for every log line in the batch
+                        log_fp = self._log_file()
+                        log_fp.write(b"".join(line for _, line in items))
+                        log_fp.flush()
+                    except OSError:
+                        # The events are already in the database
+                        logger.exception("Failed to append %d audit events to %s", len(items), self.log_file)
+                    
+                    for _ in entries:
+                        queue.task_done()
+                    entries = []
+        except Exception:
+            self._unwritten = entries
+            raise
     
-    async def _log_to_database(self, event: AuditEvent):
-        """Log event to database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO audit_events (
-                    event_type, level, user_id, username, resource, action,
-                    details, client_info, success, error_message, timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event.event_type.value,
-                event.level.value,
-                event.user_id,
-                event.username,
-                event.resource,
-                event.action,
-                json.dumps(event.details),
-                json.dumps(event.client_info),
-                event.success,
-                event.error_message,
-                event.timestamp
-            ))
-            await db.commit()
+    async def _next_batch(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop) -> List[list]:
+        """Wait for the next queue entry, then gather more for one group commit"""
+        entries = [await queue.get()]
+        count = len(entries[0])
+        # Group commit: gather whatever arrives within a short window, up to a full batch
+        deadline = loop.time() + _GROUP_COMMIT_SECONDS
+        while count < _BATCH_SIZE:
+            if queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                entry = queue.get_nowait()
+            entries.append(entry)
+            count += len(entry)
+        return entries
+    
+    async def _write_batch(self, db: aiosqlite.Connection, rows: List[tuple]):
+        """Insert a batch of event rows in one transaction, retrying if it fails"""
+        for attempt in range(_WRITE_ATTEMPTS):
+            try:
+                await db.executemany(_INSERT_EVENT_SQL, rows)
+                await db.commit()
+                return
+            except Exception as e:
+                await db.rollback()
+                if attempt == _WRITE_ATTEMPTS - 1:
+                    self._write_log_line("ERROR", {"error": f"Failed to write {len(rows)} audit events: {e}"})
+                    raise
+                await asyncio.sleep(_RETRY_DELAY_SECONDS * 2 ** attempt)
+    
+    async def flush(self):
+        """Wait until every queued event has been written to the database
+        
+        A writer that died is restarted on its unwritten events first; if they
+        still cannot be written, its error is raised and the events stay queued.
+        """
+        if not self._writer_on_loop():
+            return
+        queue = self._ensure_writer()
+        writer = self._writer
+        joined = asyncio.ensure_future(queue.join())
+        try:
+            done, _ = await asyncio.wait((joined, writer), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            joined.cancel()
+        if joined not in done:
+            raise writer.exception()
+    
+    async def close(self):
+        """Flush queued events, stop the background writer, close the log file and pooled readers
+        
+        Raises the writer's error if queued events could not be written; they are discarded.
+        """
+        try:
+            await self.flush()
+        finally:
+            if self._writer_running():
+                self._writer.cancel()
+                try:
+                    await self._writer
+                except asyncio.CancelledError:
+                    pass
+            self._writer = None
+            self._queue = None
+            self._unwritten = []
+            
+            if self._log_fp is not None:
+                self._log_fp.close()
+                self._log_fp = None
+            
+            if self._read_pool_loop is asyncio.get_running_loop():
+                for db in self._read_conns:
+                    await db.close()
+            self._read_conns = []
+            self._read_pool = None
+            self._read_pool_loop = None
     
-    def _log_to_file(self, event: AuditEvent):
-        """Log event to file"""
-        log_data = event.to_dict()
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a read-only connection from the pool, opening the pool on first use"""
+        loop = asyncio.get_running_loop()
+        if self._read_pool is None or self._read_pool_loop is not loop:
+            self._read_pool = asyncio.Queue()
+            self._read_pool_loop = loop
+            self._read_conns = []
+            uri = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+            try:
+                for _ in range(_READ_POOL_SIZE):
+                    db = await aiosqlite.connect(uri, uri=True)
+                    self._read_conns.append(db)
+                    await self._configure(db, read_only=True)
+                    self._read_pool.put_nowait(db)
+            except Exception:
+                for db in self._read_conns:
+                    await db.close()
+                self._read_conns = []
+                self._read_pool = None
+                self._read_pool_loop = None
+                raise
         
-        # Choose appropriate log level
-        if event.level == AuditLevel.CRITICAL:
-            self.logger.critical(json.dumps(log_data))
-        elif event.level == AuditLevel.ERROR:
-            self.logger.error(json.dumps(log_data))
-        elif event.level == AuditLevel.WARNING:
-            self.logger.warning(json.dumps(log_data))
-        else:
-            self.logger.info(json.dumps(log_data))
+        pool = self._read_pool
+        db = await pool.get()
+        try:
+            yield db
+        finally:
+            pool.put_nowait(db)
+    
+    def _archive_path(self, month: str) -> str:
+        """Path of the archive database holding one month (YYYYMM) of events"""
+        return os.path.join(os.path.dirname(self.db_path) or ".", f"audit-{month}.db")
+    
+    def _archive_months(self) -> List[str]:
+        """Months (YYYYMM) that have an archive database, newest first"""
+        try:
+            names = os.listdir(os.path.dirname(self.db_path) or ".")
+        except FileNotFoundError:
+            return []
+        return sorted((match.group(1) for match in map(_ARCHIVE_NAME.fullmatch, names) if match),
+                      reverse=True)
+    
+    async def _archives_since(self, db: aiosqlite.Connection,
+                              start_time: Optional[datetime]) -> List[str]:
+        """Archive months that may hold events at or after start_time, newest first
+        
+        Every archived event is older than every live one, so archives are only
+        needed when no live event is as old as the start of the range.
+        """
+        if start_time is not None:
+            cursor = await db.execute(
+                "SELECT 1 FROM audit_events WHERE timestamp <= ? LIMIT 1", (start_time,)
+            )
+            if await cursor.fetchone() is not None:
+                return []
+            first_month = start_time.strftime("%Y%m")
+            return [month for month in self._archive_months() if month >= first_month]
+        return self._archive_months()
+    
+    @asynccontextmanager
+    async def _archive_reader(self, month: str):
+        """Open a read-only connection to one month's archive database"""
+        uri = Path(os.path.abspath(self._archive_path(month))).as_uri() + "?mode=ro"
+        db = await aiosqlite.connect(uri, uri=True)
+        try:
+            await self._configure(db, read_only=True)
+            yield db
+        finally:
+            await db.close()
+    
+    async def archive_events(self, retention_days: int = 30) -> int:
+        """Move events older than the retention window into monthly archive databases
+        
+        Keeps the live audit_events table (and its indexes) small so recent-window
+        queries stay in cache; get_audit_events and get_security_summary read the
+        archives too when a range reaches past the live table. Returns the number
+        of archived events.
+        """
+        if not self._db_initialized:
+            await self.init_db()
+        await self.flush()
+        
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        archived = 0
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            await self._configure(db)
+            cursor = await db.execute("""
+                SELECT DISTINCT strftime('%Y%m', timestamp) FROM audit_events
+                WHERE timestamp < ?
+            """, (cutoff,))
+            months = [row[0] for row in await cursor.fetchall() if row[0]]
+            
+            for month in months:
+                # ATTACH is not allowed inside a transaction, so each month gets its own
+                await db.execute("ATTACH DATABASE ? AS archive", (self._archive_path(month),))
+                try:
+                    await db.execute("""
+                        CREATE TABLE IF NOT EXISTS archive.audit_events AS
+                        SELECT * FROM main.audit_events WHERE 0
+                    """)
+                    await db.execute("""
+                        CREATE INDEX IF NOT EXISTS archive.idx_audit_timestamp
+                        ON audit_events(timestamp)
+                    """)
+                    # Copy and delete in one transaction so an event is never in both or neither
+                    await db.execute("""
+                        INSERT INTO archive.audit_events
+                        SELECT * FROM main.audit_events
+                        WHERE timestamp < ? AND strftime('%Y%m', timestamp) = ?
+                    """, (cutoff, month))
+                    cursor = await db.execute("""
+                        DELETE FROM main.audit_events
+                        WHERE timestamp < ? AND strftime('%Y%m', timestamp) = ?
+                    """, (cutoff, month))
+                    archived += cursor.rowcount
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+                finally:
+                    await db.execute("DETACH DATABASE archive")
+        
+        return archived
+    
+    def _event_line(self, event: AuditEvent) -> bytes:
+        """Serialize an event into an audit log line"""
+        return self._log_line(event.level.upper(), event.to_dict())
+    
+    def _log_line(self, level: str, message: Any) -> bytes:
+        """Build one JSON line for the audit log file"""
+        return _dumps({"timestamp": datetime.utcnow(), "level": level, "message": message}) + b"\n"
+    
+    def _log_file(self):
+        """Return the audit log file, opening it for appending if needed"""
+        if self._log_fp is None:
+            self._log_fp = open(self.log_file, "ab", buffering=1 << 16)
+        return self._log_fp
+    
+    def _write_log_line(self, level: str, message: Any):
+        """Append a line for the logger's own warnings/errors directly to the audit log file"""
+        log_fp = self._log_file()
+        log_fp.write(self._log_line(level, message))
+        log_fp.flush()
     
     async def log_authentication(self, event_type: AuditEventType, user_id: Optional[int],
                                username: Optional[str], success: bool,
@@ -294,8 +669,13 @@ class AuditLogger:
         """Retrieve audit events with filtering"""
         if not self._db_initialized:
             await self.init_db()
+        await self.flush()
         
-        query = "SELECT * FROM audit_events WHERE 1=1"
+        query = """
+            SELECT id, event_type, level, user_id, username, resource, action,
+                   details, client_info, success, error_message, timestamp
+            FROM audit_events WHERE 1=1
+        """
         params = []
         
         if user_id:
@@ -315,90 +695,133 @@ class AuditLogger:
             params.append(end_time)
         
         query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(query, params)
-            rows = await cursor.fetchall()
-            
-            events = []
-            for row in rows:
-                event_data = {
-                    "id": row[0],
-                    "event_type": row[1],
-                    "level": row[2],
-                    "user_id": row[3],
-                    "username": row[4],
-                    "resource": row[5],
-                    "action": row[6],
-                    "details": json.loads(row[7]) if row[7] else {},
-                    "client_info": json.loads(row[8]) if row[8] else {},
-                    "success": bool(row[9]),
-                    "error_message": row[10],
-                    "timestamp": row[11]
-                }
-                events.append(event_data)
-            
-            return events
+        async with self._reader() as db:
+            events = await self._fetch_events(db, query, params + [limit])
+            months = [] if len(events) >= limit else await self._archives_since(db, start_time)
+        
+        # Archives hold ever older events, so reading them newest first continues
+        # the same order, as one UNION ALL over the live table and archives would
+        last_month = end_time.strftime("%Y%m") if end_time else None
+        for month in months:
+            if len(events) >= limit:
+                break
+            if last_month is not None and month > last_month:
+                continue
+            async with self._archive_reader(month) as db:
+                events += await self._fetch_events(db, query, params + [limit - len(events)])
+        
+        return events
+    
+    async def _fetch_events(self, db: aiosqlite.Connection, query: str,
+                            params: List[Any]) -> List[Dict[str, Any]]:
+        """Run an audit event query and build the event dicts"""
+        cursor = await db.execute(query, params)
+        
+        # Build each event as rows stream in instead of fetching them all first
+        return [
+            {
+                "id": row[0],
+                "event_type": row[1],
+                "level": row[2],
+                "user_id": row[3],
+                "username": row[4],
+                "resource": row[5],
+                "action": row[6],
+                "details": _loads(row[7]) if row[7] else {},
+                "client_info": _loads(row[8]) if row[8] else {},
+                "success": bool(row[9]),
+                "error_message": row[10],
+                "timestamp": row[11]
+            }
+            async for row in cursor
+        ]
     
     async def get_security_summary(self, hours: int = 24) -> Dict[str, Any]:
         """Get security summary for the last N hours"""
         if not self._db_initialized:
             await self.init_db()
+        await self.flush()
         
         start_time = datetime.utcnow() - timedelta(hours=hours)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # Failed login attempts
-            cursor = await db.execute("""
-                SELECT COUNT(*) FROM audit_events 
-                WHERE event_type = ? AND timestamp >= ? AND success = 0
-            """, (AuditEventType.LOGIN_FAILURE.value, start_time))
-            failed_logins = (await cursor.fetchone())[0]
-            
-            # Successful logins
-            cursor = await db.execute("""
-                SELECT COUNT(*) FROM audit_events 
-                WHERE event_type = ? AND timestamp >= ? AND success = 1
-            """, (AuditEventType.LOGIN_SUCCESS.value, start_time))
-            successful_logins = (await cursor.fetchone())[0]
-            
-            # Security violations
-            cursor = await db.execute("""
-                SELECT COUNT(*) FROM audit_events 
-                WHERE event_type IN (?, ?, ?) AND timestamp >= ?
-            """, (
-                AuditEventType.BRUTE_FORCE_DETECTED.value,
-                AuditEventType.SUSPICIOUS_ACTIVITY.value,
-                AuditEventType.SECURITY_VIOLATION.value,
-                start_time
-            ))
-            security_violations = (await cursor.fetchone())[0]
-            
-            # Rate limit violations
-            cursor = await db.execute("""
-                SELECT COUNT(*) FROM audit_events 
-                WHERE event_type = ? AND timestamp >= ?
-            """, (AuditEventType.RATE_LIMIT_EXCEEDED.value, start_time))
-            rate_limit_violations = (await cursor.fetchone())[0]
-            
-            # Top users by activity
-            cursor = await db.execute("""
-                SELECT username, COUNT(*) as activity_count 
-                FROM audit_events 
-                WHERE timestamp >= ? AND username IS NOT NULL
-                GROUP BY username 
-                ORDER BY activity_count DESC 
-                LIMIT 10
-            """, (start_time,))
-            top_users = await cursor.fetchall()
-            
-            return {
-                "period_hours": hours,
-                "failed_logins": failed_logins,
-                "successful_logins": successful_logins,
-                "security_violations": security_violations,
-                "rate_limit_violations": rate_limit_violations,
-                "top_users": [{"username": row[0], "activity_count": row[1]} for row in top_users],
-                "generated_at": datetime.utcnow().isoformat()
-            }
+        async with self._reader() as db:
+            months = await self._archives_since(db, start_time)
+            # Pinned to the covering index: without statistics the planner would rather
+            # scan all of idx_audit_et_user_ts to skip the (small) GROUP BY sort. Only
+            # the top users are needed unless archive counts are merged in below
+            counts, user_counts = await self._summary_counts(
+                db, start_time, "INDEXED BY idx_audit_ts_type_success", None if months else 10
+            )
+        
+        # Ranges reaching past the live table add each archive's counts, the same
+        # totals as grouping one UNION ALL over them
+        for month in months:
+            async with self._archive_reader(month) as db:
+                archive_counts, archive_user_counts = await self._summary_counts(db, start_time)
+            for key, count in archive_counts.items():
+                counts[key] = counts.get(key, 0) + count
+            for username, count in archive_user_counts.items():
+                user_counts[username] = user_counts.get(username, 0) + count
+        
+        by_type = {}
+        for (event_type, _), count in counts.items():
+            by_type[event_type] = by_type.get(event_type, 0) + count
+        
+        failed_logins = counts.get((AuditEventType.LOGIN_FAILURE.value, False), 0)
+        successful_logins = counts.get((AuditEventType.LOGIN_SUCCESS.value, True), 0)
+        security_violations = sum(
+            by_type.get(event_type.value, 0)
+            for event_type in (
+                AuditEventType.BRUTE_FORCE_DETECTED,
+                AuditEventType.SUSPICIOUS_ACTIVITY,
+                AuditEventType.SECURITY_VIOLATION,
+            )
+        )
+        rate_limit_violations = by_type.get(AuditEventType.RATE_LIMIT_EXCEEDED.value, 0)
+        
+        # Top users by activity
+        top_users = sorted(user_counts.items(), key=lambda item: item[1], reverse=True)[:10]
+        
+        return {
+            "period_hours": hours,
+            "failed_logins": failed_logins,
+            "successful_logins": successful_logins,
+            "security_violations": security_violations,
+            "rate_limit_violations": rate_limit_violations,
+            "top_users": [{"username": username, "activity_count": count} for username, count in top_users],
+            "generated_at": datetime.utcnow().isoformat()
+        }
+    
+    async def _summary_counts(self, db: aiosqlite.Connection, start_time: datetime,
+                              index_hint: str = "", top_users: Optional[int] = None
+                              ) -> tuple[Dict[tuple, int], Dict[str, int]]:
+        """Count events since start_time by (event_type, success) and by username
+        
+        Only the top_users most active usernames are returned if a limit is given.
+        """
+        # One grouped scan replaces a COUNT query per category
+        cursor = await db.execute(f"""
+            SELECT event_type, success, COUNT(*) FROM audit_events {index_hint}
+            WHERE timestamp >= ?
+            GROUP BY event_type, success
+        """, (start_time,))
+        counts = {
+            (event_type, bool(success)): count
+            for event_type, success, count in await cursor.fetchall()
+        }
+        
+        query = """
+            SELECT username, COUNT(*) as activity_count 
+            FROM audit_events 
+            WHERE timestamp >= ? AND username IS NOT NULL
+            GROUP BY username 
+        """
+        params = [start_time]
+        if top_users is not None:
+            query += " ORDER BY activity_count DESC LIMIT ?"
+            params.append(top_users)
+        cursor = await db.execute(query, params)
+        user_counts = {username: count for username, count in await cursor.fetchall()}
+        
+        return counts, user_counts
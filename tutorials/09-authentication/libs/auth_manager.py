@@ -5,11 +5,14 @@ Handles user authentication, authorization, and session management.
 
 import asyncio
 import hashlib
+import logging
+import os
 import secrets
 import sqlite3
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 import aiosqlite
@@ -18,6 +21,21 @@ from jose import JWTError, jwt
 from pydantic import BaseModel
 
 
+# Connections kept open and reused across calls, so each login or key lookup
+# skips the connect/teardown and starts with a warm page cache
+_POOL_SIZE = 4
+
+# Applied once when a pooled connection is opened
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+)
+
+
+logger = logging.getLogger(__name__)
+
+
 class UserRole(str, Enum):
     """User roles for RBAC"""
     ADMIN = "admin"
@@ -43,6 +61,8 @@ class User:
     is_active: bool
     created_at: datetime
     last_login: Optional[datetime] = None
+    # Serialized profile, filled on first request; a new login yields a new User
+    profile_cache: Optional[Any] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -79,10 +99,59 @@ class AuthManager:
             warnings.simplefilter("ignore")
             self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self._db_initialized = False
+        # Caps concurrent bcrypt work at one per CPU, bound to the event loop that created it
+        self._bcrypt_slots: Optional[asyncio.Semaphore] = None
+        self._bcrypt_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Pooled connections, bound to the event loop that opened them
+        self._pool: Optional[asyncio.Queue] = None
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conns: List[aiosqlite.Connection] = []
+    
+    @asynccontextmanager
+    async def _connection(self):
+        """Borrow a database connection from the pool, opening the pool on first use"""
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._pool_loop is not loop:
+            self._pool = asyncio.Queue()
+            self._pool_loop = loop
+            self._conns = []
+            try:
+                for _ in range(_POOL_SIZE):
+                    db = await aiosqlite.connect(self.db_path)
+                    self._conns.append(db)
+                    for pragma in _CONNECTION_PRAGMAS:
+                        await db.execute(pragma)
+                    self._pool.put_nowait(db)
+            except Exception:
+                for db in self._conns:
+                    await db.close()
+                self._conns = []
+                self._pool = None
+                self._pool_loop = None
+                raise
+        
+        pool = self._pool
+        db = await pool.get()
+        try:
+            yield db
+        finally:
+            # Never hand the next caller a connection with a half-finished transaction
+            if db.in_transaction:
+                await db.rollback()
+            pool.put_nowait(db)
+    
+    async def close(self):
+        """Close the pooled database connections"""
+        if self._pool_loop is asyncio.get_running_loop():
+            for db in self._conns:
+                await db.close()
+        self._conns = []
+        self._pool = None
+        self._pool_loop = None
     
     async def init_db(self):
         """Initialize the authentication database"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             # Users table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -147,13 +216,13 @@ class AuthManager:
     
     async def _create_default_admin(self):
         """Create default admin user if no users exist"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             cursor = await db.execute("SELECT COUNT(*) FROM users")
             count = (await cursor.fetchone())[0]
             
             if count == 0:
                 admin_password = "admin123"  # Change in production!
-                password_hash = self.pwd_context.hash(admin_password)
+                password_hash = await self._run_bcrypt(self.hash_password, admin_password)
                 
                 await db.execute("""
                     INSERT INTO users (username, email, password_hash, role)
@@ -161,7 +230,16 @@ class AuthManager:
                 """, ("admin", "admin@example.com", password_hash, UserRole.ADMIN))
                 
                 await db.commit()
-                print(f"Created default admin user: admin / {admin_password}")
+                logger.warning("Created default admin user: admin / %s", admin_password)
+    
+    async def _run_bcrypt(self, func, *args):
+        """Run a bcrypt operation on a worker thread, at most one per CPU at a time"""
+        loop = asyncio.get_running_loop()
+        if self._bcrypt_loop is not loop:
+            self._bcrypt_slots = asyncio.Semaphore(os.cpu_count() or 1)
+            self._bcrypt_loop = loop
+        async with self._bcrypt_slots:
+            return await asyncio.to_thread(func, *args)
     
     def hash_password(self, password: str) -> str:
         """Hash a password"""
@@ -185,10 +263,11 @@ class AuthManager:
         if not self._db_initialized:
             await self.init_db()
             
-        password_hash = self.hash_password(password)
+        # bcrypt is deliberately slow; run it on a worker thread so other requests keep flowing
+        password_hash = await self._run_bcrypt(self.hash_password, password)
         
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._connection() as db:
                 cursor = await db.execute("""
                     INSERT INTO users (username, email, password_hash, role)
                     VALUES (?, ?, ?, ?)
@@ -213,34 +292,38 @@ class AuthManager:
         if not self._db_initialized:
             await self.init_db()
             
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             cursor = await db.execute("""
                 SELECT id, username, email, password_hash, role, is_active, created_at, last_login
                 FROM users WHERE username = ? AND is_active = 1
             """, (username,))
-            
             row = await cursor.fetchone()
-            if not row:
-                return None
-            
-            if not self.verify_password(password, row[3]):
-                return None
-            
-            # Update last login
+        
+        if not row:
+            return None
+        
+        # Verified with no pooled connection held, so slow hashing never
+        # starves other queries; bcrypt releases the GIL, so verifications
+        # on worker threads run in parallel
+        if not await self._run_bcrypt(self.verify_password, password, row[3]):
+            return None
+        
+        # Update last login
+        async with self._connection() as db:
             await db.execute("""
                 UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
             """, (row[0],))
             await db.commit()
-            
-            return User(
-                id=row[0],
-                username=row[1],
-                email=row[2],
-                role=UserRole(row[4]),
-                is_active=bool(row[5]),
-                created_at=datetime.fromisoformat(row[6]),
-                last_login=datetime.utcnow()
-            )
+        
+        return User(
+            id=row[0],
+            username=row[1],
+            email=row[2],
+            role=UserRole(row[4]),
+            is_active=bool(row[5]),
+            created_at=datetime.fromisoformat(row[6]),
+            last_login=datetime.utcnow()
+        )
     
     async def authenticate_api_key(self, api_key: str) -> Optional[User]:
         """Authenticate user with API key"""
@@ -249,7 +332,7 @@ class AuthManager:
             
         key_hash = self.hash_api_key(api_key)
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             cursor = await db.execute("""
                 SELECT u.id, u.username, u.email, u.role, u.is_active, u.created_at,
                        ak.id, ak.permissions, ak.expires_at
@@ -294,7 +377,7 @@ class AuthManager:
             expires_at = datetime.utcnow() + timedelta(days=expires_days)
         
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._connection() as db:
                 await db.execute("""
                     INSERT INTO api_keys (user_id, key_hash, name, permissions, expires_at)
                     VALUES (?, ?, ?, ?, ?)
@@ -370,7 +453,7 @@ class AuthManager:
         if not self._db_initialized:
             await self.init_db()
             
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             await db.execute("""
                 INSERT INTO audit_log (user_id, action, resource, details, ip_address, user_agent, success)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
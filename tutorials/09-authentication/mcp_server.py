@@ -5,79 +5,168 @@ Compatible with MCP client connections.
 """
 
 import asyncio
+import itertools
+import logging
 import os
 import json
+import queue
+import sys
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 import aiosqlite
+import anyio
 from dotenv import load_dotenv
-from functools import wraps
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from weakref import WeakKeyDictionary
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 from mcp.types import Tool, TextContent, Resource
 
 from libs.auth_manager import AuthManager, User, UserRole
 from libs.audit_logger import AuditLogger, AuditEventType, AuditLevel
-from libs.security_utils import SecurityAuditor, InputValidator
+from libs.security_utils import SecurityAuditor, InputValidator, RateLimiter, RateLimitConfig
+
+# Optional faster JSON serializer; orjson encodes datetime natively
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _json_default(obj: Any) -> str:
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, default=_json_default)
 
 # Load environment variables
 load_dotenv()
 
+# Server messages are handed to a background thread that writes them to stderr
+# (stdout carries the MCP stdio protocol); startup banners only show with MCP_VERBOSE set
+logger = logging.getLogger("auth_mcp_server")
+logger.setLevel(logging.INFO if os.getenv("MCP_VERBOSE") else logging.WARNING)
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+log_listener = QueueListener(_log_queue, logging.StreamHandler(sys.stderr))
+
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-change-this")
 DATABASE_PATH = os.getenv("DATABASE_PATH", "./auth.db")
+SUMMARY_CACHE_SECONDS = float(os.getenv("SUMMARY_CACHE_SECONDS", "30"))
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "30"))
 
 # Initialize components
 auth_manager = AuthManager(DATABASE_PATH, SECRET_KEY)
 audit_logger = AuditLogger(DATABASE_PATH)
+# Login attempts per account (or for API keys as a whole), so reconnecting
+# doesn't reset the budget; rejects floods before any bcrypt or database work
+auth_rate_limiter = RateLimiter(RateLimitConfig(
+    requests_per_window=int(os.getenv("AUTH_RATE_LIMIT_PER_MINUTE", "20")),
+    window_seconds=60,
+    burst_requests=5,
+    burst_window_seconds=1
+))
+
+@asynccontextmanager
+async def server_lifespan(_server: FastMCP):
+    """Write out buffered audit events and close pooled connections on shutdown"""
+    try:
+        yield {}
+    finally:
+        # Shielded so the cleanup still runs when shutdown cancels the server's task group
+        with anyio.CancelScope(shield=True):
+            await audit_logger.close()
+            await auth_manager.close()
 
 # Create MCP server
-server = FastMCP("authenticated-mcp-server")
-
-# Global variable to store current authenticated user
-current_auth_user = None
-
-# Authentication middleware decorators
-def require_auth(func):
-    """Middleware decorator to require authentication"""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        global current_auth_user
-        if not current_auth_user:
-            return [TextContent(type="text", text=json.dumps({"error": "Authentication required"}))]
-        return await func(*args, **kwargs)
-    return wrapper
-
-def require_admin(func):
-    """Middleware decorator to require admin role"""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        global current_auth_user
-        if not current_auth_user:
-            return [TextContent(type="text", text=json.dumps({"error": "Authentication required"}))]
-        if current_auth_user.role != UserRole.ADMIN:
-            return [TextContent(type="text", text=json.dumps({"error": "Admin access required"}))]
-        return await func(*args, **kwargs)
-    return wrapper
-
-# Individual tool handlers with decorators
+server = FastMCP("authenticated-mcp-server", lifespan=server_lifespan)
+
+# Note ids: a counter seeded from the start time, unique even for notes created in the same instant
+_note_ids = itertools.count(time.time_ns())
+
+# Security summary responses by period (hours) -> (expiry on the monotonic clock, response);
+# expired entries are pruned whenever a new one is stored
+_summary_cache: Dict[int, tuple[float, list[TextContent]]] = {}
+
+# Authenticated user per MCP client session, so clients never see each other's login;
+# an entry is dropped together with its session
+session_users: "WeakKeyDictionary[Any, User]" = WeakKeyDictionary()
+
+def text_response(result: Any) -> list[TextContent]:
+    """Wrap a JSON-serializable result as a tool response"""
+    return [TextContent(type="text", text=_dumps(result))]
+
+# Fixed rejections, built once and returned as-is on every denied call
+AUTH_REQUIRED = text_response({"error": "Authentication required"})
+ADMIN_REQUIRED = text_response({"error": "Admin access required"})
+
+async def internal_error(tool: str, error: Exception) -> list[TextContent]:
+    """Audit an unexpected tool failure and build its error response"""
+    await audit_logger.log_security_event(
+        AuditEventType.SYSTEM_ERROR,
+        AuditLevel.ERROR,
+        {"ip_address": "localhost"},
+        {"error": str(error), "tool": tool}
+    )
+    return text_response({"error": f"Internal error: {str(error)}"})
+
+# Authentication checks, called at the top of each protected tool; no wrapper coroutine per call
+def check_auth(ctx: Context) -> tuple[Optional[User], Optional[list[TextContent]]]:
+    """Return the session's user, or an error response if nobody is logged in"""
+    user = session_users.get(ctx.session)
+    if not user:
+        return None, AUTH_REQUIRED
+    return user, None
+
+def check_admin(ctx: Context) -> tuple[Optional[User], Optional[list[TextContent]]]:
+    """Return the session's user, or an error response unless it is an admin"""
+    user, denied = check_auth(ctx)
+    if denied:
+        return None, denied
+    if user.role != UserRole.ADMIN:
+        return None, ADMIN_REQUIRED
+    return user, None
+
+async def check_rate_limit(identifier: str, tool: str) -> Optional[list[TextContent]]:
+    """Return an error response if authentication attempts for identifier arrive too fast"""
+    allowed, retry_after = auth_rate_limiter.is_allowed(identifier)
+    if allowed:
+        return None
+    await audit_logger.log_security_event(
+        AuditEventType.RATE_LIMIT_EXCEEDED,
+        AuditLevel.WARNING,
+        {"ip_address": "localhost"},
+        {"tool": tool, "retry_after": retry_after}
+    )
+    result = {"success": False, "error": "Rate limit exceeded", "retry_after": retry_after}
+    return text_response(result)
+
+# Individual tool handlers
 
 @server.tool()
-async def authenticate_user(username: str, password: str) -> list[TextContent]:
+async def authenticate_user(username: str, password: str, ctx: Context) -> list[TextContent]:
     """Authenticate user with username and password"""
-    global current_auth_user
+    limited = await check_rate_limit(f"user:{username}", "authenticate_user")
+    if limited:
+        return limited
     
     try:
         # Validate input
         if not InputValidator.validate_username(username):
             result = {"success": False, "error": "Invalid username format"}
-            return [TextContent(type="text", text=json.dumps(result))]
+            return text_response(result)
         
         # Authenticate user
         user = await auth_manager.authenticate_user(username, password)
         
         if user:
-            current_auth_user = user
+            session_users[ctx.session] = user
             
             # Create access token
             access_token_expires = timedelta(minutes=30)
@@ -106,25 +195,23 @@ async def authenticate_user(username: str, password: str) -> list[TextContent]:
             
             result = {"success": False, "error": "Invalid username or password"}
         
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return text_response(result)
     except Exception as e:
-        await audit_logger.log_security_event(
-            AuditEventType.SYSTEM_ERROR,
-            AuditLevel.ERROR,
-            {"error": str(e), "tool": "authenticate_user"}
-        )
-        return [TextContent(type="text", text=json.dumps({"error": f"Internal error: {str(e)}"}, indent=2))]
+        return await internal_error("authenticate_user", e)
 
 @server.tool()
-async def authenticate_with_api_key(api_key: str) -> list[TextContent]:
+async def authenticate_with_api_key(api_key: str, ctx: Context) -> list[TextContent]:
     """Authenticate using API key"""
-    global current_auth_user
+    # API keys carry no account name; guesses share one server-wide budget
+    limited = await check_rate_limit("api_key", "authenticate_with_api_key")
+    if limited:
+        return limited
     
     try:
         user = await auth_manager.authenticate_api_key(api_key)
         
         if user:
-            current_auth_user = user
+            session_users[ctx.session] = user
             
             await audit_logger.log_api_key_event(
                 AuditEventType.API_KEY_USED,
@@ -142,36 +229,36 @@ async def authenticate_with_api_key(api_key: str) -> list[TextContent]:
         else:
             result = {"success": False, "error": "Invalid API key"}
         
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return text_response(result)
     except Exception as e:
-        await audit_logger.log_security_event(
-            AuditEventType.SYSTEM_ERROR,
-            AuditLevel.ERROR,
-            {"error": str(e), "tool": "authenticate_with_api_key"}
-        )
-        return [TextContent(type="text", text=json.dumps({"error": f"Internal error: {str(e)}"}, indent=2))]
+        return await internal_error("authenticate_with_api_key", e)
 
 @server.tool()
-@require_auth
-async def get_user_profile() -> list[TextContent]:
+async def get_user_profile(ctx: Context) -> list[TextContent]:
     """Get current user's profile information (requires authentication)"""
-    global current_auth_user
+    user, denied = check_auth(ctx)
+    if denied:
+        return denied
     
-    profile = {
-        "id": current_auth_user.id,
-        "username": current_auth_user.username,
-        "email": current_auth_user.email,
-        "role": current_auth_user.role.value,
-        "created_at": current_auth_user.created_at.isoformat(),
-        "last_login": current_auth_user.last_login.isoformat() if current_auth_user.last_login else None
-    }
-    return [TextContent(type="text", text=json.dumps(profile, indent=2))]
+    # The profile can't change while logged in, so it is serialized once per login
+    if user.profile_cache is None:
+        profile = {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "role": user.role.value,
+            "created_at": user.created_at,
+            "last_login": user.last_login
+        }
+        user.profile_cache = text_response(profile)
+    return user.profile_cache
 
 @server.tool()
-@require_auth
-async def create_secure_note(title: str, content: str) -> list[TextContent]:
+async def create_secure_note(title: str, content: str, ctx: Context) -> list[TextContent]:
     """Create a secure note (authenticated users only)"""
-    global current_auth_user
+    user, denied = check_auth(ctx)
+    if denied:
+        return denied
     
     try:
         # Sanitize input
@@ -179,64 +266,68 @@ async def create_secure_note(title: str, content: str) -> list[TextContent]:
         content = InputValidator.sanitize_string(content, 1000)
         
         note = {
-            "id": f"note_{datetime.utcnow().timestamp()}",
+            "id": f"note_{next(_note_ids):x}",
             "title": title,
             "content": content,
-            "author": current_auth_user.username,
-            "created_at": datetime.utcnow().isoformat()
+            "author": user.username,
+            "created_at": datetime.utcnow()
         }
         
-        return [TextContent(type="text", text=json.dumps(note, indent=2))]
+        return text_response(note)
     except Exception as e:
-        await audit_logger.log_security_event(
-            AuditEventType.SYSTEM_ERROR,
-            AuditLevel.ERROR,
-            {"error": str(e), "tool": "create_secure_note"}
-        )
-        return [TextContent(type="text", text=json.dumps({"error": f"Internal error: {str(e)}"}, indent=2))]
+        return await internal_error("create_secure_note", e)
 
 @server.tool()
-@require_admin
-async def list_audit_events(limit: int = 10) -> list[TextContent]:
+async def list_audit_events(ctx: Context, limit: int = 10) -> list[TextContent]:
     """List recent audit events (admin only)"""
+    _, denied = check_admin(ctx)
+    if denied:
+        return denied
+    
     try:
         events = await audit_logger.get_audit_events(limit=limit)
-        return [TextContent(type="text", text=json.dumps(events, indent=2))]
+        return text_response(events)
     except Exception as e:
-        await audit_logger.log_security_event(
-            AuditEventType.SYSTEM_ERROR,
-            AuditLevel.ERROR,
-            {"error": str(e), "tool": "list_audit_events"}
-        )
-        return [TextContent(type="text", text=json.dumps({"error": f"Internal error: {str(e)}"}, indent=2))]
+        return await internal_error("list_audit_events", e)
 
 @server.tool()
-@require_admin
-async def get_security_summary(hours: int = 24) -> list[TextContent]:
+async def get_security_summary(ctx: Context, hours: int = 24) -> list[TextContent]:
     """Get security summary for the last N hours (admin only)"""
+    _, denied = check_admin(ctx)
+    if denied:
+        return denied
+    
     try:
+        # Dashboards poll this repeatedly; serve a recent result instead of re-querying
+        now = time.monotonic()
+        cached = _summary_cache.get(hours)
+        if cached and cached[0] > now:
+            return cached[1]
+        
         summary = await audit_logger.get_security_summary(hours)
-        return [TextContent(type="text", text=json.dumps(summary, indent=2))]
+        response = text_response(summary)
+        # Drop expired periods so one-off `hours` values don't accumulate
+        for key in [key for key, (expiry, _) in _summary_cache.items() if expiry <= now]:
+            del _summary_cache[key]
+        _summary_cache[hours] = (now + SUMMARY_CACHE_SECONDS, response)
+        return response
     except Exception as e:
-        await audit_logger.log_security_event(
-            AuditEventType.SYSTEM_ERROR,
-            AuditLevel.ERROR,
-            {"error": str(e), "tool": "get_security_summary"}
-        )
-        return [TextContent(type="text", text=json.dumps({"error": f"Internal error: {str(e)}"}, indent=2))]
+        return await internal_error("get_security_summary", e)
 
 @server.tool()
-@require_auth
-async def create_api_key(name: str, permissions: list = None, expires_days: int = None) -> list[TextContent]:
+async def create_api_key(ctx: Context, name: str, permissions: list = None,
+                         expires_days: int = None) -> list[TextContent]:
     """Create a new API key (authenticated users only)"""
-    global current_auth_user
+    user, denied = check_auth(ctx)
+    if denied:
+        return denied
     
     try:
         if permissions is None:
             permissions = ["read"]
         
         api_key = await auth_manager.create_api_key(
-            current_auth_user.id,
+            user.id,
             name,
             permissions,
             expires_days
@@ -245,11 +336,11 @@ async def create_api_key(name: str, permissions: list = None, expires_days: int
         if api_key:
             expires_at = None
             if expires_days:
-                expires_at = (datetime.utcnow() + timedelta(days=expires_days)).isoformat()
+                expires_at = datetime.utcnow() + timedelta(days=expires_days)
             
             await audit_logger.log_api_key_event(
                 AuditEventType.API_KEY_CREATED,
-                current_auth_user.id, current_auth_user.username,
+                user.id, user.username,
                 name, {"ip_address": "localhost"},
                 {"permissions": permissions, "expires_days": expires_days}
             )
@@ -263,28 +354,22 @@ async def create_api_key(name: str, permissions: list = None, expires_days: int
         else:
             result = {"success": False, "error": "Failed to create API key"}
         
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return text_response(result)
     except Exception as e:
-        await audit_logger.log_security_event(
-            AuditEventType.SYSTEM_ERROR,
-            AuditLevel.ERROR,
-            {"error": str(e), "tool": "create_api_key"}
-        )
-        return [TextContent(type="text", text=json.dumps({"error": f"Internal error: {str(e)}"}, indent=2))]
+        return await internal_error("create_api_key", e)
 
 @server.tool()
-async def logout() -> list[TextContent]:
+async def logout(ctx: Context) -> list[TextContent]:
     """Logout current user"""
-    global current_auth_user
+    user = session_users.pop(ctx.session, None)
     
-    if current_auth_user:
-        username = current_auth_user.username
-        current_auth_user = None
+    if user:
+        username = user.username
         result = {"success": True, "message": f"User {username} logged out"}
     else:
         result = {"success": False, "message": "No user logged in"}
     
-    return [TextContent(type="text", text=json.dumps(result))]
+    return text_response(result)
 
 
 # Resources are handled through tools in FastMCP
@@ -294,6 +379,10 @@ async def init_server():
     await auth_manager.init_db()
     await audit_logger.init_db()
     
+    # Move events past the retention window out of the live audit table into
+    # monthly archives (still read by audit queries that reach back that far)
+    await audit_logger.archive_events(AUDIT_RETENTION_DAYS)
+    
     # Log server start
     await audit_logger.log_security_event(
         AuditEventType.SERVER_START,
@@ -302,13 +391,22 @@ async def init_server():
         {"database": DATABASE_PATH}
     )
     
-    print(f"🔐 Authenticated MCP Server initialized")
-    print(f"📊 Database: {DATABASE_PATH}")
-    print(f"🔍 Audit logging enabled")
-    print(f"🚀 Server ready for MCP connections")
+    # Write out queued events and close pooled connections before this event loop ends;
+    # both reopen on the server's loop
+    await audit_logger.close()
+    await auth_manager.close()
+    
+    logger.info("🔐 Authenticated MCP Server initialized")
+    logger.info("📊 Database: %s", DATABASE_PATH)
+    logger.info("🔍 Audit logging enabled")
+    logger.info("🚀 Server ready for MCP connections")
 
 if __name__ == "__main__":
-    # Initialize server
-    asyncio.run(init_server())
-    # Run the FastMCP server
-    server.run()
+    log_listener.start()
+    try:
+        # Initialize server
+        asyncio.run(init_server())
+        # Run the FastMCP server
+        server.run()
+    finally:
+        log_listener.stop()
@@ -13,11 +13,22 @@ from contextlib import contextmanager
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import pymongo
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 
 logger = logging.getLogger(__name__)
 
+# Prepared statements kept per SQLite connection, so repeated queries skip the parser
+SQLITE_CACHED_STATEMENTS = 256
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Put each new pooled SQLite connection into WAL mode with NORMAL syncing."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 
 class DatabaseManager:
     """Secure database manager with RBAC integration."""
@@ -49,7 +60,13 @@ class DatabaseManager:
         db_path = self.connection_string or 'data/internal_system.db'
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        self.engine = create_engine(f'sqlite:///{db_path}')
+        # The engine pools connections, so the pragmas and statement cache
+        # persist across queries instead of being rebuilt per call
+        self.engine = create_engine(
+            f'sqlite:///{db_path}',
+            connect_args={'cached_statements': SQLITE_CACHED_STATEMENTS}
+        )
+        event.listen(self.engine, 'connect', _configure_sqlite_connection)
         self.SessionLocal = sessionmaker(bind=self.engine)
         
         # Create sample tables
@@ -159,15 +176,15 @@ class DatabaseManager:
                 'department': 'IT', 'position': 'System Administrator', 'salary': 80000, 'hire_date': '2020-09-05', 'status': 'active'}
             ]
             
-            for emp in employees_data:
-                try:
-                    conn.execute(text("""
-                        INSERT OR IGNORE INTO employees 
-                        (employee_id, first_name, last_name, email, department, position, salary, hire_date, status)
-                        VALUES (:employee_id, :first_name, :last_name, :email, :department, :position, :salary, :hire_date, :status)
-                    """), emp)
-                except Exception as e:
-                    print(f"Error inserting employee {emp['employee_id']}: {e}")
+            # One executemany for the whole list rather than a statement per row
+            try:
+                conn.execute(text("""
+                    INSERT OR IGNORE INTO employees 
+                    (employee_id, first_name, last_name, email, department, position, salary, hire_date, status)
+                    VALUES (:employee_id, :first_name, :last_name, :email, :department, :position, :salary, :hire_date, :status)
+                """), employees_data)
+            except Exception as e:
+                logger.error(f"Error inserting employee data: {e}")
             
             conn.commit()
             
@@ -181,15 +198,15 @@ class DatabaseManager:
                 'currency': 'USD', 'description': 'Travel expenses', 'fiscal_year': 2023, 'quarter': 3}
             ]
             
-            for fin in financial_data:
-                try:
-                    conn.execute(text("""
-                        INSERT OR IGNORE INTO financial_records 
-                        (record_id, employee_id, record_type, amount, currency, description, fiscal_year, quarter)
-                        VALUES (:record_id, :employee_id, :record_type, :amount, :currency, :description, :fiscal_year, :quarter)
-                    """), fin)
-                except Exception as e:
-                    print(f"Error inserting financial record {fin['record_id']}: {e}")
+            # One executemany for the whole list rather than a statement per row
+            try:
+                conn.execute(text("""
+                    INSERT OR IGNORE INTO financial_records 
+                    (record_id, employee_id, record_type, amount, currency, description, fiscal_year, quarter)
+                    VALUES (:record_id, :employee_id, :record_type, :amount, :currency, :description, :fiscal_year, :quarter)
+                """), financial_data)
+            except Exception as e:
+                logger.error(f"Error inserting financial record data: {e}")
             
             conn.commit()
             
@@ -201,15 +218,15 @@ class DatabaseManager:
                 'category': 'announcements', 'published_date': '2023-12-15', 'status': 'published'}
             ]
             
-            for pub in public_data:
-                try:
-                    conn.execute(text("""
-                        INSERT OR IGNORE INTO public_info 
-                        (info_id, title, content, category, published_date, status)
-                        VALUES (:info_id, :title, :content, :category, :published_date, :status)
-                    """), pub)
-                except Exception as e:
-                    logger.error(f"Error inserting public info {pub['info_id']}: {e}")
+            # One executemany for the whole list rather than a statement per row
+            try:
+                conn.execute(text("""
+                    INSERT OR IGNORE INTO public_info 
+                    (info_id, title, content, category, published_date, status)
+                    VALUES (:info_id, :title, :content, :category, :published_date, :status)
+                """), public_data)
+            except Exception as e:
+                logger.error(f"Error inserting public info data: {e}")
             
             conn.commit()
     
@@ -2,8 +2,20 @@ import requests
 import base64
 from datetime import datetime, timedelta, timezone
 from email.mime.text import MIMEText
+from http.cookiejar import DefaultCookiePolicy
 from typing import Dict, Any
 
+from requests.adapters import HTTPAdapter
+
+# One keep-alive pool shared by every adapter, so repeated calls to the Google
+# APIs and the RBAC proxy reuse open connections instead of a new TCP+TLS
+# handshake per request
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+_session.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+# Adapters belong to different users; never carry cookies between them
+_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
 class GoogleApiAdapter:
 
     def __init__(self, client_id: str, client_secret: str, rbac_proxy_url: str, rbac_token: str):
@@ -15,7 +27,7 @@ class GoogleApiAdapter:
 
     def _init_authentication_context(self):
         url = f"{self.rbac_proxy_url}/token/google"
-        r = requests.get(url, headers={"Authorization": f"Bearer {self.rbac_token}"})
+        r = _session.get(url, headers={"Authorization": f"Bearer {self.rbac_token}"})
         self.access_token = r.json().get("access_token")
         self.token_expiration = r.json().get("expiration_time")
         self.headers = {"Authorization": f"Bearer {self.access_token}"}
@@ -32,7 +44,7 @@ class GoogleApiAdapter:
             raise Exception("Insufficient permissions to read google profile")
             
         url = "https://openidconnect.googleapis.com/v1/userinfo"
-        r = requests.get(url, headers=self.headers)
+        r = _session.get(url, headers=self.headers)
         return r.json()
 
     def list_files(self, page_size=10, user_context: Dict[str, Any] = None):
@@ -48,7 +60,7 @@ class GoogleApiAdapter:
             
         url = "https://www.googleapis.com/drive/v3/files"
         params = {"pageSize": page_size, "fields": "files(id,name)"}
-        r = requests.get(url, headers=self.headers, params=params)
+        r = _session.get(url, headers=self.headers, params=params)
                 
         return r.json().get("files", [])
 
@@ -66,7 +78,7 @@ class GoogleApiAdapter:
         # Step 1: Get list of message IDs
         list_url = "https://gmail.googleapis.com/gmail/v1/users/me/messages"
         params = {"maxResults": max_results}
-        r = requests.get(list_url, headers=self.headers, params=params)
+        r = _session.get(list_url, headers=self.headers, params=params)
         
         message_ids = r.json().get("messages", [])
         
@@ -78,7 +90,7 @@ class GoogleApiAdapter:
                 "format": "metadata",
                 "metadataHeaders": "From,Subject,Date"  # Try as comma-separated string
             }
-            msg_response = requests.get(msg_url, headers=self.headers, params=msg_params)
+            msg_response = _session.get(msg_url, headers=self.headers, params=msg_params)
             
             if msg_response.status_code == 200:
                 detailed_messages.append(msg_response.json())
@@ -100,7 +112,7 @@ class GoogleApiAdapter:
             raise Exception("Insufficient permissions to read google calendars")
             
         url = "https://www.googleapis.com/calendar/v3/users/me/calendarList"
-        r = requests.get(url, headers=self.headers)
+        r = _session.get(url, headers=self.headers)
 
         return r.json().get("items", [])
 
@@ -117,7 +129,7 @@ class GoogleApiAdapter:
             
         url = "https://www.googleapis.com/calendar/v3/calendars"
         body = {"summary": summary, "timeZone": "UTC"}
-        r = requests.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=body)
+        r = _session.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=body)
         
         return r.json()
 
@@ -133,7 +145,7 @@ class GoogleApiAdapter:
             raise Exception("Insufficient permissions to remove google calendar")
             
         url = f"https://www.googleapis.com/calendar/v3/calendars/{calendar_id}"
-        r = requests.delete(url, headers=self.headers)
+        r = _session.delete(url, headers=self.headers)
 
         return {"status": r.status_code, "calendarId": calendar_id}
 
@@ -155,7 +167,7 @@ class GoogleApiAdapter:
           "orderBy": "startTime",
           "timeMin": datetime.now(timezone.utc).isoformat()
       }
-      r = requests.get(url, headers=self.headers, params=params)
+      r = _session.get(url, headers=self.headers, params=params)
 
       return r.json().get("items", [])
 
@@ -189,7 +201,7 @@ class GoogleApiAdapter:
           "start": {"dateTime": start_time, "timeZone": "UTC"},
           "end": {"dateTime": end_time, "timeZone": "UTC"}
       }
-      r = requests.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=body)
+      r = _session.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=body)
       
       return r.json()
 
@@ -212,6 +224,6 @@ class GoogleApiAdapter:
         raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
         send_body = {"raw": raw_message}
 
-        r = requests.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=send_body)
+        r = _session.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=send_body)
         
         return r.json()